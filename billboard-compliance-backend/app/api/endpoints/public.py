@@ -1,92 +1,197 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from fastapi_cache.decorator import cache
 from typing import List, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+import msgspec
+from sqlalchemy import String, case, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
 from ... import models, schemas
 from ...database import get_db
-from ...core.config import settings
+from ...responses import ORJSONResponse
+from ...cache import (
+    HEATMAP_BATCH_SIZE, HEATMAP_CACHE_MAX_BYTES, HEATMAP_EXPIRE, HEATMAP_NAMESPACE,
+    STATS_EXPIRE, STATS_NAMESPACE,
+    get_cached, heatmap_key_builder, set_cached, stats_key_builder
+)
 
 router = APIRouter()
 
-@router.get("/heatmap", response_model=List[schemas.HeatmapPoint])
+def _enum_value(column, enum_cls):
+    """Map a native enum column to its API value inside SQL.
+    
+    Postgres stores the member names, so JSON built in the database would
+    otherwise say 'SIZE_VIOLATION' where the API says 'size_violation'.
+    """
+    return case(
+        {member.name: member.value for member in enum_cls},
+        value=cast(column, String)
+    )
+
+@router.get(
+    "/heatmap",
+    response_class=Response,
+    responses={200: {"model": List[schemas.HeatmapPoint]}}
+)
 async def get_heatmap_data(
     days: int = 30,
-    violation_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    violation_type: Optional[models.ViolationType] = None,
+    bbox: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get heatmap data for flagged billboards within the specified time range.
     
     - **days**: Number of days of data to include (default: 30)
     - **violation_type**: Filter by specific violation type if needed
+    - **bbox**: Restrict to a bounding box given as `min_lng,min_lat,max_lng,max_lat`
+    
+    Points come from the `heatmap_cells` materialized view (one point per
+    grid cell and day, weighted by violation count). Rows are streamed from
+    a server-side cursor and encoded with msgspec one batch at a time.
+    Bodies up to HEATMAP_CACHE_MAX_BYTES are cached so repeat requests skip
+    the database; larger ones are only streamed, keeping memory to a batch.
     """
+    cache_key = heatmap_key_builder(
+        get_heatmap_data,
+        HEATMAP_NAMESPACE,
+        kwargs={
+            "days": days,
+            "violation_type": violation_type.value if violation_type else None,
+            "bbox": bbox
+        }
+    )
+    cached = await get_cached(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
     # Calculate date range
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
+    start_date = datetime.utcnow() - timedelta(days=days)
     
-    # Build base query
-    query = db.query(
-        models.Report.latitude,
-        models.Report.longitude,
-        models.Violation.type,
-        models.Violation.severity,
-        models.Report.created_at
-    ).join(
-        models.Violation,
-        models.Report.id == models.Violation.report_id
-    ).filter(
-        models.Report.status == 'verified',
-        models.Report.created_at.between(start_date, end_date)
+    cells = models.heatmap_cells
+    
+    # Query the pre-aggregated grid cells; column order matches HeatmapPointStruct
+    stmt = select(
+        cells.c.latitude,
+        cells.c.longitude,
+        cells.c.weight,
+        cells.c.violation_type,
+        cells.c.severity,
+        cells.c.day
+    ).where(
+        cells.c.day >= func.date_trunc('day', start_date)
     )
     
     # Apply filters if provided
     if violation_type:
-        query = query.filter(models.Violation.type == violation_type)
-    
-    # Convert to heatmap points
-    heatmap_data = []
-    for point in query.all():
-        heatmap_data.append({
-            "latitude": point.latitude,
-            "longitude": point.longitude,
-            "weight": 1,  # Can be adjusted based on severity
-            "violation_type": point.type,
-            "severity": point.severity,
-            "date": point.created_at.isoformat()
-        })
-    
-    return heatmap_data
+        stmt = stmt.where(cells.c.violation_type == violation_type)
+    
+    if bbox:
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox.split(","))
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="bbox must be 'min_lng,min_lat,max_lng,max_lat'"
+            )
+        stmt = stmt.where(
+            cells.c.longitude.between(min_lng, max_lng),
+            cells.c.latitude.between(min_lat, max_lat)
+        )
+    
+    result = await db.stream(stmt.execution_options(yield_per=HEATMAP_BATCH_SIZE))
+    
+    async def encode_points():
+        # Emit one JSON array, a batch of comma-separated points at a time.
+        # Batches are buffered for the cache until the body outgrows the cap.
+        chunks: Optional[List[bytes]] = [b"["]
+        size = 0
+        first = True
+        yield b"["
+        async for rows in result.partitions():
+            chunk = msgspec.json.encode([schemas.HeatmapPointStruct(*row) for row in rows])[1:-1]
+            if not first:
+                chunk = b"," + chunk
+            first = False
+            if chunks is not None:
+                size += len(chunk)
+                if size > HEATMAP_CACHE_MAX_BYTES:
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+            yield chunk
+        yield b"]"
+        if chunks is not None:
+            chunks.append(b"]")
+            await set_cached(cache_key, b"".join(chunks), HEATMAP_EXPIRE)
+    
+    return StreamingResponse(encode_points(), media_type="application/json")
 
-@router.get("/stats", response_model=schemas.PublicStats)
-async def get_public_stats(db: Session = Depends(get_db)):
+@router.get(
+    "/stats",
+    response_class=ORJSONResponse,
+    response_model=None,
+    responses={200: {"model": schemas.PublicStats}}
+)
+@cache(expire=STATS_EXPIRE, namespace=STATS_NAMESPACE, key_builder=stats_key_builder)
+async def get_public_stats(db: AsyncSession = Depends(get_db)):
     """
     Get public statistics about billboard violations
+    
+    All figures are computed from CTEs and assembled into a single JSON
+    object, so the endpoint costs one database round-trip.
     """
-    # Get total violations
-    total_violations = db.query(models.Violation).count()
-    
-    # Get violations by type
-    violations_by_type = db.query(
-        models.Violation.type,
-        models.func.count(models.Violation.id)
-    ).group_by(models.Violation.type).all()
-    
-    # Get violations by severity
-    violations_by_severity = db.query(
-        models.Violation.severity,
-        models.func.count(models.Violation.id)
-    ).group_by(models.Violation.severity).all()
-    
-    # Get recent activity
-    recent_activity = db.query(
-        models.Report
+    # Violations by type
+    by_type = select(
+        _enum_value(models.Violation.violation_type, models.ViolationType).label("key"),
+        func.count(models.Violation.id).label("count")
+    ).group_by(models.Violation.violation_type).cte("by_type")
+    
+    # Violations by severity
+    by_severity = select(
+        models.Violation.severity.label("key"),
+        func.count(models.Violation.id).label("count")
+    ).group_by(models.Violation.severity).cte("by_severity")
+    
+    # Recent activity
+    recent = select(
+        models.Report.id,
+        models.Report.billboard_id,
+        _enum_value(models.Report.status, models.ReportStatus).label("status"),
+        models.Report.description,
+        models.Report.latitude,
+        models.Report.longitude,
+        models.Report.created_at
     ).order_by(
         models.Report.created_at.desc()
-    ).limit(10).all()
-    
-    return {
-        "total_violations": total_violations,
-        "violations_by_type": dict(violations_by_type),
-        "violations_by_severity": dict(violations_by_severity),
-        "recent_activity": recent_activity
-    }
+    ).limit(10).cte("recent")
+    
+    empty_object = literal_column("'{}'::json")
+    empty_array = literal_column("'[]'::json")
+    
+    stmt = select(
+        func.json_build_object(
+            "total_violations",
+            select(func.count(models.Violation.id)).scalar_subquery(),
+            "violations_by_type",
+            select(func.coalesce(
+                func.json_object_agg(by_type.c.key, by_type.c.count), empty_object
+            )).scalar_subquery(),
+            "violations_by_severity",
+            select(func.coalesce(
+                func.json_object_agg(by_severity.c.key, by_severity.c.count), empty_object
+            )).scalar_subquery(),
+            "recent_activity",
+            select(func.coalesce(
+                func.json_agg(aggregate_order_by(
+                    recent.table_valued(), recent.c.created_at.desc()
+                )),
+                empty_array
+            )).scalar_subquery()
+        )
+    )
+    
+    stats = (await db.execute(stmt)).scalar()
+    
+    return ORJSONResponse(content=stats)
@@ -0,0 +1,96 @@
+"""Response caching for the read-heavy public endpoints.
+
+Responses are cached in Redis through fastapi-cache2. Cached payloads are
+stored as the serialized JSON body and served back without re-parsing.
+Services reuse the same backend for per-user results (see rewards_key).
+"""
+import logging
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import Coder
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+# Cache namespaces and lifetimes (seconds)
+STATS_NAMESPACE = "stats"
+STATS_EXPIRE = 60
+HEATMAP_NAMESPACE = "heatmap"
+HEATMAP_EXPIRE = 300
+# Rows fetched and encoded per chunk when streaming the heatmap
+HEATMAP_BATCH_SIZE = 1000
+# Largest streamed heatmap body kept for the cache; bigger responses are
+# streamed without buffering and not cached
+HEATMAP_CACHE_MAX_BYTES = 2 * 1024 * 1024
+REWARDS_NAMESPACE = "rewards"
+REWARDS_EXPIRE = 300
+
+class ORJSONCoder(Coder):
+    """Store JSON bodies as bytes and replay them as-is on a cache hit."""
+    
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        if isinstance(value, Response):
+            return value.body
+        return orjson.dumps(value, default=str)
+    
+    @classmethod
+    def decode(cls, value: bytes) -> Response:
+        return Response(content=value, media_type="application/json")
+
+def _prefixed(namespace: str) -> str:
+    """Qualify a namespace with the cache prefix, exactly once.
+    
+    Depending on the fastapi-cache2 release, the @cache decorator hands key
+    builders either the bare namespace or one already carrying the prefix;
+    keys must match what invalidate() clears either way.
+    """
+    prefix = FastAPICache.get_prefix()
+    if namespace.startswith(f"{prefix}:"):
+        return namespace
+    return f"{prefix}:{namespace}"
+
+def stats_key_builder(func: Callable, namespace: str = "", **kwargs) -> str:
+    """The public stats take no parameters, so a single key suffices."""
+    return f"{_prefixed(namespace)}:all"
+
+def heatmap_key_builder(
+    func: Callable,
+    namespace: str = "",
+    kwargs: Optional[dict] = None,
+    **_
+) -> str:
+    """Key heatmap responses by their query parameters only."""
+    kwargs = kwargs or {}
+    return (
+        f"{_prefixed(namespace)}:"
+        f"{kwargs.get('days')}:{kwargs.get('violation_type')}:{kwargs.get('bbox')}"
+    )
+
+def rewards_key(user_id: Any) -> str:
+    """Key for a user's cached rewards summary."""
+    return f"{_prefixed(REWARDS_NAMESPACE)}:{user_id}"
+
+async def get_cached(key: str) -> Optional[bytes]:
+    """Read a cached body for responses that manage their own cache entry."""
+    try:
+        return await FastAPICache.get_backend().get(key)
+    except Exception as e:
+        logger.warning(f"Failed to read cache key {key}: {str(e)}")
+        return None
+
+async def set_cached(key: str, value: bytes, expire: int) -> None:
+    """Store a body for responses that manage their own cache entry."""
+    try:
+        await FastAPICache.get_backend().set(key, value, expire)
+    except Exception as e:
+        logger.warning(f"Failed to write cache key {key}: {str(e)}")
+
+async def invalidate(namespace: str) -> None:
+    """Drop every cached response in a namespace after a write."""
+    try:
+        await FastAPICache.clear(namespace=namespace)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate cache namespace {namespace}: {str(e)}")
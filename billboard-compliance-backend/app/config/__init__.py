@@ -3,7 +3,8 @@
 This module defines the application's configuration settings using Pydantic,
 which allows for environment variable overrides and type validation.
 """
-from pydantic_settings import BaseSettings
+from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     """Application settings with default values and environment variable overrides.
@@ -17,6 +18,8 @@ class Settings(BaseSettings):
         secret_key: Secret key for JWT token generation
         algorithm: Algorithm used for JWT tokens
         access_token_expire_minutes: Token expiration time in minutes
+        redis_url: Redis connection URL used for response caching
+        audit_database_url: Database URL for audit log writes (defaults to the main database)
     """
     database_hostname: str = "localhost"
     database_port: str = "3306"  # Default MySQL/MariaDB port
@@ -26,9 +29,9 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    redis_url: str = "redis://localhost:6379/0"
+    audit_database_url: Optional[str] = None
 
-    class Config:
-        """Pydantic config class for settings."""
-        env_file = ".env"
+    model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
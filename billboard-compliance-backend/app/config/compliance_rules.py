@@ -1,6 +1,6 @@
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
-from pydantic import BaseModel, Field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
 
 class ZoneType(str, Enum):
     PROHIBITED = "prohibited"
@@ -77,6 +77,16 @@ class ContentRestriction(ComplianceRule):
         ]
     )
     
+    _prohibited_content_set: FrozenSet[str] = PrivateAttr(default_factory=frozenset)
+    
+    def model_post_init(self, __context: Any) -> None:
+        """Freeze prohibited content into a set for intersection checks"""
+        self._prohibited_content_set = frozenset(self.prohibited_content)
+    
+    @property
+    def prohibited_content_set(self) -> FrozenSet[str]:
+        return self._prohibited_content_set
+    
 class SafetyRequirement(ComplianceRule):
     """Rules related to structural and public safety"""
     requires_structural_certificate: bool = True
@@ -101,26 +111,53 @@ class ComplianceConfig(BaseModel):
     safety_requirements: List[SafetyRequirement]
     administrative_requirements: List[AdministrativeRequirement]
     
+    # Rules per (zone, billboard type) and category, built once on load
+    _rule_index: Dict[Tuple[ZoneType, BillboardType], Dict[str, List[ComplianceRule]]] = PrivateAttr(
+        default_factory=dict
+    )
+    
+    def model_post_init(self, __context: Any) -> None:
+        """Index every rule under each (zone, billboard type) it applies to"""
+        categories = {
+            "size": list(self.size_restrictions.values()),
+            "location": self.location_restrictions,
+            "content": self.content_restrictions,
+            "safety": self.safety_requirements,
+            "administrative": self.administrative_requirements,
+        }
+        
+        index: Dict[Tuple[ZoneType, BillboardType], Dict[str, List[ComplianceRule]]] = {}
+        for category, rules in categories.items():
+            for rule in rules:
+                for zone in dict.fromkeys(rule.applicable_zones):
+                    for billboard_type in dict.fromkeys(rule.applicable_billboard_types):
+                        entry = index.setdefault(
+                            (zone, billboard_type), {name: [] for name in categories}
+                        )
+                        entry[category].append(rule)
+        
+        self._rule_index = index
+    
     def get_applicable_rules(
         self, 
         zone: ZoneType, 
         billboard_type: BillboardType,
         content_category: Optional[ContentCategory] = None
     ) -> Dict[str, List[ComplianceRule]]:
-        """Get all rules applicable to a specific billboard"""
-        def is_applicable(rule: ComplianceRule) -> bool:
-            return (
-                zone in rule.applicable_zones and
-                billboard_type in rule.applicable_billboard_types
-            )
+        """Get all rules applicable to a specific billboard
         
-        return {
-            "size": [r for r in self.size_restrictions.values() if is_applicable(r)],
-            "location": [r for r in self.location_restrictions if is_applicable(r)],
-            "content": [r for r in self.content_restrictions if is_applicable(r)],
-            "safety": [r for r in self.safety_requirements if is_applicable(r)],
-            "administrative": [r for r in self.administrative_requirements if is_applicable(r)],
-        }
+        The returned lists are shared with the index and must not be mutated.
+        """
+        rules = self._rule_index.get((zone, billboard_type))
+        if rules is None:
+            return {
+                "size": [],
+                "location": [],
+                "content": [],
+                "safety": [],
+                "administrative": [],
+            }
+        return rules
 
 # Example configuration for a city
 def load_default_config() -> ComplianceConfig:
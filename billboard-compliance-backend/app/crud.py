@@ -1,24 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-import shutil
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import aiofiles
+import aiofiles.os
 import os
-from datetime import datetime
+import uuid
+from pathlib import Path
 from . import models, schemas, auth
 from .database import get_db
 from .config import settings
+from .cache import STATS_NAMESPACE, invalidate
 from typing import List
 
 router = APIRouter()
 
 # File upload directory
 UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+UPLOAD_PATH = Path(UPLOAD_DIR)
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+_upload_dir_ready = False
+
+async def _ensure_upload_dir() -> None:
+    """Create the upload directory on first use rather than at import."""
+    global _upload_dir_ready
+    if not _upload_dir_ready:
+        await aiofiles.os.makedirs(UPLOAD_PATH, exist_ok=True)
+        _upload_dir_ready = True
 
 # Billboard operations
 @router.post("/billboards/", response_model=schemas.Billboard)
-def create_billboard(
+async def create_billboard(
     billboard: schemas.BillboardCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     if current_user.role not in ["inspector", "admin"]:
@@ -26,77 +39,114 @@ def create_billboard(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions to create billboard"
         )
-    db_billboard = models.Billboard(**billboard.dict())
+    db_billboard = models.Billboard(**billboard.model_dump(exclude_unset=True))
     db.add(db_billboard)
-    db.commit()
-    db.refresh(db_billboard)
+    await db.commit()
+    await db.refresh(db_billboard)
     return db_billboard
 
 @router.get("/billboards/", response_model=List[schemas.Billboard])
-def read_billboards(
+async def read_billboards(
     skip: int = 0, 
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    billboards = db.query(models.Billboard).offset(skip).limit(limit).all()
-    return billboards
+    result = await db.execute(
+        select(models.Billboard).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
 
 # Report operations
 @router.post("/reports/", response_model=schemas.Report)
 async def create_report(
     report: schemas.ReportCreate,
     image: UploadFile = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     # Save image if provided
     image_url = None
     if image:
+        # Random names: timestamps collide between concurrent uploads
         file_extension = os.path.splitext(image.filename)[1]
-        filename = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}{file_extension}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
+        filename = f"{uuid.uuid4().hex}{file_extension}"
+        file_path = UPLOAD_PATH / filename
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
+        await _ensure_upload_dir()
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await image.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
         
         image_url = f"/{UPLOAD_DIR}/{filename}"
     
     # Create report
     db_report = models.Report(
-        **report.dict(),
+        **report.model_dump(),
         reporter_id=current_user.id,
         image_url=image_url,
         status=schemas.ReportStatus.PENDING
     )
     
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    await db.commit()
+    await db.refresh(db_report)
+    await invalidate(STATS_NAMESPACE)
     
     # TODO: Add billboard detection and violation checking logic
     
     return db_report
 
+@router.post("/reports/bulk", response_model=List[schemas.Report])
+async def create_reports_bulk(
+    reports: List[schemas.ReportCreate],
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if current_user.role not in ["inspector", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to import reports"
+        )
+    if not reports:
+        return []
+    
+    # Single executemany INSERT ... RETURNING instead of one flush per report
+    result = await db.scalars(
+        insert(models.Report).returning(models.Report),
+        [
+            {
+                **report.model_dump(),
+                "reporter_id": current_user.id,
+                "status": schemas.ReportStatus.PENDING
+            }
+            for report in reports
+        ]
+    )
+    db_reports = result.all()
+    await db.commit()
+    await invalidate(STATS_NAMESPACE)
+    
+    return db_reports
+
 @router.get("/reports/", response_model=List[schemas.Report])
-def read_reports(
+async def read_reports(
     skip: int = 0, 
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    if current_user.role == "admin":
-        reports = db.query(models.Report).offset(skip).limit(limit).all()
-    else:
-        reports = db.query(models.Report).filter(
-            models.Report.reporter_id == current_user.id
-        ).offset(skip).limit(limit).all()
-    return reports
+    # schemas.Report only carries column fields, so no relations are loaded
+    query = select(models.Report)
+    if current_user.role != "admin":
+        query = query.where(models.Report.reporter_id == current_user.id)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 # Violation operations
 @router.post("/violations/", response_model=schemas.Violation)
-def create_violation(
+async def create_violation(
     violation: schemas.ViolationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     # Check if the user has permission to create violations
@@ -108,37 +158,36 @@ def create_violation(
     
     # Create violation
     db_violation = models.Violation(
-        **violation.dict(),
+        **violation.model_dump(),
         reporter_id=current_user.id,
         status="reported"
     )
     
     db.add(db_violation)
-    db.commit()
-    db.refresh(db_violation)
+    await db.commit()
+    await db.refresh(db_violation)
     
     # Update report status
-    report = db.query(models.Report).filter(
-        models.Report.id == violation.report_id
-    ).first()
+    report = await db.get(models.Report, violation.report_id)
     
     if report:
         report.status = schemas.ReportStatus.IN_REVIEW
-        db.commit()
+        await db.commit()
+    
+    await invalidate(STATS_NAMESPACE)
     
     return db_violation
 
 @router.get("/violations/", response_model=List[schemas.Violation])
-def read_violations(
+async def read_violations(
     skip: int = 0, 
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    if current_user.role == "admin":
-        violations = db.query(models.Violation).offset(skip).limit(limit).all()
-    else:
-        violations = db.query(models.Violation).filter(
-            models.Violation.reporter_id == current_user.id
-        ).offset(skip).limit(limit).all()
-    return violations
+    # schemas.Violation only carries column fields, so no relations are loaded
+    query = select(models.Violation)
+    if current_user.role != "admin":
+        query = query.where(models.Violation.reporter_id == current_user.id)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
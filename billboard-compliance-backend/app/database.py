@@ -1,18 +1,68 @@
+from typing import Any, AsyncIterator
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
+SQLALCHEMY_ASYNC_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def json_dumps(value: Any) -> str:
+    """Serialize JSON column values (e.g. audit log details) with orjson."""
+    return orjson.dumps(
+        value, default=str, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+# Synchronous engine for schema creation, services and scheduled jobs.
+# Connections are pooled and checked before use, and recycled before
+# server/proxy idle timeouts can drop them
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=QueuePool,
+    pool_size=20,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    json_serializer=json_dumps,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Small dedicated pool for audit log writes, so they neither wait for nor
+# hold connections used by requests
+audit_engine = create_engine(
+    settings.audit_database_url or SQLALCHEMY_DATABASE_URL,
+    poolclass=QueuePool,
+    pool_size=5,
+    max_overflow=5,
+    pool_pre_ping=True,
+    json_serializer=json_dumps,
+)
+AuditSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=audit_engine)
+
+# Async engine for request handlers so DB I/O doesn't block the event loop
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    pool_size=20,
+    max_overflow=10,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    connect_args={
+        # SQLAlchemy's cache of asyncpg prepared statements per connection
+        "prepared_statement_cache_size": 512,
+        # asyncpg's own statement cache
+        "statement_cache_size": 1024,
+        # Kill runaway queries before they tie up pooled connections;
+        # set at connect time so it costs no extra round-trip per request
+        "server_settings": {"statement_timeout": "5000"},
+    },
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
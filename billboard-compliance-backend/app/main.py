@@ -1,15 +1,23 @@
 from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
 from . import models, schemas, crud, auth
-from .database import engine, get_db
+from .database import engine, async_engine, get_db
 from .config import settings
+from .cache import ORJSONCoder
+from .utils.audit_logger import audit_writer
+from .responses import ORJSONResponse
+import logging
 import uvicorn
 
+logger = logging.getLogger(__name__)
+
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Billboard Compliance API")
+app = FastAPI(title="Billboard Compliance API", default_response_class=ORJSONResponse)
 
 # CORS middleware configuration
 app.add_middleware(
@@ -24,6 +32,28 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(crud.router, prefix="/api", tags=["Core Operations"])
 
+@app.on_event("startup")
+async def init_cache():
+    redis = aioredis.from_url(settings.redis_url)
+    FastAPICache.init(RedisBackend(redis), prefix="billboard-cache", coder=ORJSONCoder)
+
+@app.on_event("startup")
+async def log_pool_status():
+    logger.info(f"Database pool: {engine.pool.status()}")
+    logger.info(f"Async database pool: {async_engine.pool.status()}")
+
+@app.on_event("startup")
+async def start_audit_writer():
+    await audit_writer.start()
+
+@app.on_event("shutdown")
+async def flush_audit_writer():
+    await audit_writer.stop()
+
+@app.on_event("shutdown")
+async def dispose_engine():
+    await async_engine.dispose()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Billboard Compliance API"}
@@ -1,9 +1,22 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, Index, Computed, DDL, event, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import column, func, table
+from geoalchemy2 import Geography
 from .database import Base
 import enum
 
+# Point derived from the latitude/longitude pair so existing writers keep
+# setting plain floats while spatial queries get a PostGIS geography.
+LOCATION_EXPRESSION = "ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography"
+
+# The geography columns and the heatmap view need PostGIS, so enable it
+# before create_all() builds any table (as migration 002 does for old ones).
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS postgis").execute_if(dialect="postgresql")
+)
+
 class UserRole(str, enum.Enum):
     CITIZEN = "citizen"
     INSPECTOR = "inspector"
@@ -11,6 +24,14 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Leaderboard order; INCLUDE lets the ranking be an index-only scan
+        Index(
+            "ix_users_total_points_desc",
+            column("total_points").desc().nulls_last(), "id",
+            postgresql_include=["full_name", "report_count"]
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
@@ -18,16 +39,27 @@ class User(Base):
     full_name = Column(String)
     role = Column(Enum(UserRole), default=UserRole.CITIZEN)
     is_active = Column(Boolean, default=True)
+    total_points = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    streak_days = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    last_report_at = Column(DateTime)  # UTC, naive like datetime.utcnow()
+    report_count = Column(Integer, nullable=False, default=0, server_default=text("0"))  # kept by the trigger from migration 016
     
-    reports = relationship("Report", back_populates="reporter")
-    violations = relationship("Violation", back_populates="reporter")
+    reports = relationship("Report", back_populates="reporter", lazy="raise")
+    violations = relationship("Violation", back_populates="reporter", lazy="raise")
 
 class Billboard(Base):
     __tablename__ = "billboards"
+    __table_args__ = (
+        Index("ix_billboards_location", "location", postgresql_using="spgist"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    location = Column(
+        Geography("POINT", srid=4326, spatial_index=False),
+        Computed(LOCATION_EXPRESSION, persisted=True)
+    )
     address = Column(String)
     width = Column(Float)  # in meters
     height = Column(Float)  # in meters
@@ -38,8 +70,8 @@ class Billboard(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    reports = relationship("Report", back_populates="billboard")
-    violations = relationship("Violation", back_populates="billboard")
+    reports = relationship("Report", back_populates="billboard", lazy="raise")
+    violations = relationship("Violation", back_populates="billboard", lazy="raise")
 
 class ReportStatus(str, enum.Enum):
     PENDING = "pending"
@@ -49,6 +81,20 @@ class ReportStatus(str, enum.Enum):
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        # Heatmap filter: status = ... AND created_at BETWEEN ...
+        Index("ix_reports_status_created", "status", "created_at"),
+        Index("ix_reports_latlon", "latitude", "longitude"),
+        Index("ix_reports_location", "location", postgresql_using="spgist"),
+        # Partial covering index so the heatmap rollup over resolved
+        # reports is an index-only scan that never touches the heap.
+        # Enum(ReportStatus) stores member names, hence 'RESOLVED'.
+        Index(
+            "ix_reports_heatmap", "status", "created_at",
+            postgresql_include=["id", "latitude", "longitude", "location"],
+            postgresql_where=text("status = 'RESOLVED'")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     billboard_id = Column(Integer, ForeignKey("billboards.id"))
@@ -59,11 +105,15 @@ class Report(Base):
     video_url = Column(String, nullable=True)
     latitude = Column(Float)
     longitude = Column(Float)
+    location = Column(
+        Geography("POINT", srid=4326, spatial_index=False),
+        Computed(LOCATION_EXPRESSION, persisted=True)
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    billboard = relationship("Billboard", back_populates="reports")
-    reporter = relationship("User", back_populates="reports")
-    violations = relationship("Violation", back_populates="report")
+    billboard = relationship("Billboard", back_populates="reports", lazy="raise")
+    reporter = relationship("User", back_populates="reports", lazy="raise")
+    violations = relationship("Violation", back_populates="report", lazy="raise")
 
 class ViolationType(str, enum.Enum):
     UNAUTHORIZED = "unauthorized"
@@ -75,18 +125,94 @@ class ViolationType(str, enum.Enum):
 
 class Violation(Base):
     __tablename__ = "violations"
+    __table_args__ = (
+        # Covers the report join together with the heatmap/stats columns
+        Index("ix_violations_cov", "report_id", postgresql_include=["violation_type", "severity"]),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     report_id = Column(Integer, ForeignKey("reports.id"))
     billboard_id = Column(Integer, ForeignKey("billboards.id"))
     reporter_id = Column(Integer, ForeignKey("users.id"))
-    violation_type = Column(Enum(ViolationType))
+    violation_type = Column(Enum(ViolationType), index=True)
     description = Column(String)
-    severity = Column(String)  # low, medium, high
+    severity = Column(String, index=True)  # low, medium, high
     status = Column(String, default="reported")  # reported, confirmed, resolved
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     
-    report = relationship("Report", back_populates="violations")
-    billboard = relationship("Billboard", back_populates="violations")
-    reporter = relationship("User", back_populates="violations")
+    report = relationship("Report", back_populates="violations", lazy="raise")
+    billboard = relationship("Billboard", back_populates="violations", lazy="raise")
+    reporter = relationship("User", back_populates="violations", lazy="raise")
+
+# Violations on resolved reports rolled up per ~100m grid cell, day, type and severity.
+# The heatmap reads this instead of scanning reports; refresh it on a
+# schedule with MaterializedViewService.
+HEATMAP_CELL_SIZE = 0.001  # degrees
+
+heatmap_cells = table(
+    "heatmap_cells",
+    column("latitude", Float),
+    column("longitude", Float),
+    column("day", DateTime(timezone=True)),
+    column("violation_type", Enum(ViolationType)),
+    column("severity", String),
+    column("weight", Integer),
+)
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS heatmap_cells AS
+    SELECT ST_Y(g.cell) AS latitude,
+           ST_X(g.cell) AS longitude,
+           g.day,
+           g.violation_type,
+           g.severity,
+           count(*) AS weight
+    FROM (
+        SELECT ST_SnapToGrid(r.location::geometry, {HEATMAP_CELL_SIZE}) AS cell,
+               date_trunc('day', r.created_at) AS day,
+               v.violation_type,
+               v.severity
+        FROM reports r
+        JOIN violations v ON v.report_id = r.id
+        WHERE r.status = 'RESOLVED'
+    ) g
+    GROUP BY 1, 2, 3, 4, 5;
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_heatmap_cells
+        ON heatmap_cells (latitude, longitude, day, violation_type, severity);
+    CREATE INDEX IF NOT EXISTS ix_heatmap_cells_day_type
+        ON heatmap_cells (day, violation_type);
+    """).execute_if(dialect="postgresql")
+)
+
+# Leaderboard ranking by points with each user's report count. Read by
+# IncentiveService.get_leaderboard; refreshed with MaterializedViewService.
+leaderboard_mv = table(
+    "leaderboard_mv",
+    column("user_id", String),
+    column("username", String),
+    column("score", Integer),
+    column("reports", Integer),
+    column("rank", Integer),
+)
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL("""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS leaderboard_mv AS
+    SELECT u.id::text AS user_id,
+           u.full_name AS username,
+           coalesce(u.total_points, 0) AS score,
+           u.report_count AS reports,
+           row_number() OVER (ORDER BY u.total_points DESC NULLS LAST, u.id) AS rank
+    FROM users u;
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_leaderboard_mv_user_id
+        ON leaderboard_mv (user_id);
+    CREATE INDEX IF NOT EXISTS ix_leaderboard_mv_rank
+        ON leaderboard_mv (rank);
+    """).execute_if(dialect="postgresql")
+)
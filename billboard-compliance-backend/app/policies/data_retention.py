@@ -1,14 +1,27 @@
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 import logging
+import os
+import re
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 from .. import models
 
+def _add_months(month: date, months: int) -> date:
+    """Return the first day of the month `months` after `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
 class DataRetentionPolicy:
     """
     Handles data retention and automatic cleanup of sensitive data.
     """
     
+    # Tables range-partitioned by month (see database/migrations), with
+    # partitions named <table>_YYYY_MM; audit_logs is partitioned on
+    # timestamp, the others on created_at
+    PARTITIONED_TABLES = ('reports', 'violations', 'audit_logs')
+    
     def __init__(self, config: Optional[Dict] = None):
         """
         Initialize the data retention policy.
@@ -63,6 +76,9 @@ class DataRetentionPolicy:
         """
         Delete old data according to retention policy.
         
+        Also creates the upcoming monthly partitions, so running this daily
+        keeps inserts out of the default partitions.
+        
         Args:
             db: Database session
             
@@ -76,58 +92,88 @@ class DataRetentionPolicy:
             'deleted_audit_logs': 0,
         }
         
+        now = datetime.utcnow()
+        
+        try:
+            self.ensure_partitions(db)
+        except Exception as e:
+            self.logger.error(f"Error creating upcoming partitions: {str(e)}")
+            db.rollback()
+        
         try:
-            # Anonymize old reports
-            anonymize_date = datetime.utcnow() - timedelta(
+            # Anonymize old reports in a single UPDATE
+            anonymize_date = now - timedelta(
                 days=self.config['anonymize_reports_after_days']
             )
             
-            old_reports = db.query(models.Report).filter(
+            anonymized_values = {'is_anonymized': True}
+            if hasattr(models.Report, 'device_id'):
+                anonymized_values['device_id'] = func.concat('anonymized_', models.Report.id)
+            if hasattr(models.Report, 'ip_address'):
+                anonymized_values['ip_address'] = "0.0.0.0"
+            if hasattr(models.Report, 'user_agent'):
+                anonymized_values['user_agent'] = "anonymized"
+            
+            result['anonymized_reports'] = db.query(models.Report).filter(
                 models.Report.created_at < anonymize_date,
                 models.Report.is_anonymized == False  # noqa: E712
-            ).all()
-            
-            for report in old_reports:
-                if self.anonymize_report(db, report.id):
-                    report.is_anonymized = True
-                    db.commit()
-                    result['anonymized_reports'] += 1
+            ).update(anonymized_values, synchronize_session=False)
             
             # Delete very old reports
-            delete_date = datetime.utcnow() - timedelta(
+            delete_date = now - timedelta(
                 days=self.config['report_retention_days']
             )
             
-            old_reports = db.query(models.Report).filter(
+            expired_reports = db.query(models.Report).filter(
                 models.Report.created_at < delete_date
-            ).all()
+            )
             
-            for report in old_reports:
-                # Delete associated files
-                if report.image_path and hasattr(report, 'is_original_image_deleted') \
-                   and not report.is_original_image_deleted:
+            # Delete associated files before the rows go away, streaming the
+            # paths from a server-side cursor so memory stays flat
+            if hasattr(models.Report, 'is_original_image_deleted'):
+                image_paths = expired_reports.filter(
+                    models.Report.image_path.isnot(None),
+                    models.Report.is_original_image_deleted == False  # noqa: E712
+                ).with_entities(models.Report.image_path).execution_options(
+                    stream_results=True, yield_per=1000
+                )
+                
+                for (image_path,) in image_paths:
                     try:
-                        # Delete the file from storage
-                        # Implementation depends on your storage solution
-                        # e.g., os.remove(report.image_path)
-                        report.is_original_image_deleted = True
-                        result['deleted_original_images'] += 1
+                        os.remove(image_path)
+                    except FileNotFoundError:
+                        pass
                     except Exception as e:
-                        self.logger.error(f"Error deleting image {report.image_path}: {str(e)}")
-                
-                db.delete(report)
-                result['deleted_reports'] += 1
+                        self.logger.error(f"Error deleting image {image_path}: {str(e)}")
+                        continue
+                    result['deleted_original_images'] += 1
+            
+            # Detach violations from the expired reports, as the ORM did
+            # when deleting them one by one
+            db.query(models.Violation).filter(
+                models.Violation.report_id.in_(
+                    expired_reports.with_entities(models.Report.id)
+                )
+            ).update({'report_id': None}, synchronize_session=False)
+            
+            # Whole expired months are dropped as partitions; the bulk DELETE
+            # only has to deal with the remainder
+            result['deleted_reports'] = self.drop_expired_partitions(
+                db, 'reports', delete_date
+            )
+            result['deleted_reports'] += expired_reports.delete(synchronize_session=False)
             
             # Delete old audit logs
-            audit_log_date = datetime.utcnow() - timedelta(
+            audit_log_date = now - timedelta(
                 days=self.config['audit_log_retention_days']
             )
             
-            old_logs = db.query(models.AuditLog).filter(
+            result['deleted_audit_logs'] = self.drop_expired_partitions(
+                db, 'audit_logs', audit_log_date
+            )
+            result['deleted_audit_logs'] += db.query(models.AuditLog).filter(
                 models.AuditLog.timestamp < audit_log_date
             ).delete(synchronize_session=False)
-            
-            result['deleted_audit_logs'] = old_logs
             db.commit()
             
             return result
@@ -137,6 +183,94 @@ class DataRetentionPolicy:
             db.rollback()
             return result
     
+    def _monthly_partitions(self, db: Session, table: str) -> List[Tuple[str, date]]:
+        """
+        List the monthly partitions of a table.
+        
+        Args:
+            db: Database session
+            table: Name of the partitioned table
+            
+        Returns:
+            List of (partition name, first day of month) tuples, empty if the
+            table is not partitioned
+        """
+        names = db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table)"
+            ),
+            {'table': table}
+        ).scalars()
+        
+        pattern = re.compile(rf"^{table}_(\d{{4}})_(\d{{2}})$")
+        partitions = []
+        for name in names:
+            match = pattern.match(name)
+            if match:
+                partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+        return partitions
+    
+    def drop_expired_partitions(self, db: Session, table: str, cutoff: datetime) -> int:
+        """
+        Detach and drop the monthly partitions that end before the cutoff.
+        
+        Args:
+            db: Database session
+            table: Name of the partitioned table
+            cutoff: Rows created before this are expired
+            
+        Returns:
+            Number of rows removed with the dropped partitions
+        """
+        dropped_rows = 0
+        for name, month in self._monthly_partitions(db, table):
+            if _add_months(month, 1) > cutoff.date():
+                continue
+            dropped_rows += db.execute(text(f'SELECT count(*) FROM "{name}"')).scalar()
+            if table == 'reports':
+                # Dropping a partition skips the report_count row trigger
+                db.execute(text(
+                    "UPDATE users u SET report_count = u.report_count - r.n "
+                    f'FROM (SELECT reporter_id, count(*) AS n FROM "{name}" '
+                    "GROUP BY reporter_id) r WHERE u.id = r.reporter_id"
+                ))
+            db.execute(text(f'ALTER TABLE {table} DETACH PARTITION "{name}"'))
+            db.execute(text(f'DROP TABLE "{name}"'))
+            self.logger.info(f"Dropped expired partition {name}")
+        return dropped_rows
+    
+    def ensure_partitions(self, db: Session, months_ahead: int = 2) -> None:
+        """
+        Create the current and upcoming monthly partitions of each
+        partitioned table so inserts never fall into the default partition.
+        
+        Args:
+            db: Database session
+            months_ahead: Number of future months to create
+        """
+        this_month = datetime.utcnow().date().replace(day=1)
+        for table in self.PARTITIONED_TABLES:
+            is_partitioned = db.execute(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                    "WHERE partrelid = to_regclass(:table))"
+                ),
+                {'table': table}
+            ).scalar()
+            if not is_partitioned:
+                continue
+            
+            for offset in range(months_ahead + 1):
+                start = _add_months(this_month, offset)
+                end = _add_months(start, 1)
+                db.execute(text(
+                    f'CREATE TABLE IF NOT EXISTS "{table}_{start:%Y_%m}" '
+                    f"PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+                ))
+        db.commit()
+    
     def get_retention_summary(self) -> Dict:
         """
         Get a summary of the current retention policy.
@@ -144,6 +278,8 @@ class DataRetentionPolicy:
         Returns:
             Dictionary with retention policy details
         """
+        now = datetime.utcnow()
+        
         return {
             'policy': {
                 'report_retention_days': self.config['report_retention_days'],
@@ -152,6 +288,17 @@ class DataRetentionPolicy:
                 'keep_processed_data_days': self.config['keep_processed_data_days'],
                 'audit_log_retention_days': self.config['audit_log_retention_days'],
             },
-            'last_run': datetime.utcnow().isoformat(),
-            'next_run': (datetime.utcnow() + timedelta(days=1)).isoformat(),
+            'last_run': now.isoformat(),
+            'next_run': (now + timedelta(days=1)).isoformat(),
         }
+
+if __name__ == "__main__":
+    # Daily retention run, e.g. from cron: python -m app.policies.data_retention
+    from ..database import SessionLocal
+    
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        print(DataRetentionPolicy().delete_old_data(db))
+    finally:
+        db.close()
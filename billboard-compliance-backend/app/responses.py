@@ -0,0 +1,22 @@
+"""Response classes shared by the API routers."""
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+    
+    Unlike FastAPI's own ORJSONResponse this falls back to `str()` for
+    unknown types (UUIDs, Decimals, enums from raw rows) and tags naive
+    datetimes as UTC, so plain dicts built from SQL rows can be returned
+    without going through `jsonable_encoder`.
+    """
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=str,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
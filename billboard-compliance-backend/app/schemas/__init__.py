@@ -1,7 +1,12 @@
 from typing import List, Optional
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime
-from enum import Enum
+from ..models import ReportStatus, ViolationType
+# Public API schemas, importable as app.schemas.<Name> like the rest
+from .public import (
+    ActivityItem, HeatmapPoint, HeatmapPointStruct, LeaderboardUser, PublicStats,
+    RewardTier, ViolationStats
+)
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -15,8 +20,7 @@ class User(UserBase):
     id: int
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Token(BaseModel):
     access_token: str
@@ -44,14 +48,7 @@ class Billboard(BillboardBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
-
-class ReportStatus(str, Enum):
-    PENDING = "pending"
-    IN_REVIEW = "in_review"
-    RESOLVED = "resolved"
-    REJECTED = "rejected"
+    model_config = ConfigDict(from_attributes=True)
 
 class ReportBase(BaseModel):
     billboard_id: int
@@ -70,16 +67,7 @@ class Report(ReportBase):
     video_url: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
-
-class ViolationType(str, Enum):
-    UNAUTHORIZED = "unauthorized"
-    SIZE_VIOLATION = "size_violation"
-    LOCATION_VIOLATION = "location_violation"
-    STRUCTURAL_ISSUE = "structural_issue"
-    CONTENT_VIOLATION = "content_violation"
-    EXPIRED_PERMIT = "expired_permit"
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 class ViolationBase(BaseModel):
     report_id: int
@@ -98,5 +86,4 @@ class Violation(ViolationBase):
     created_at: datetime
     resolved_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
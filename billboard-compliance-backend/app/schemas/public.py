@@ -5,6 +5,7 @@ in the public API endpoints.
 """
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import msgspec
 from pydantic import BaseModel, Field
 
 class HeatmapPoint(BaseModel):
@@ -16,6 +17,19 @@ class HeatmapPoint(BaseModel):
     severity: str = Field(..., description="Severity level (low/medium/high)")
     date: str = Field(..., description="ISO formatted date of the violation")
 
+class HeatmapPointStruct(msgspec.Struct, gc=False):
+    """Wire form of HeatmapPoint, built per row and encoded with msgspec.
+    
+    HeatmapPoint stays the documented schema; this mirrors its fields
+    without per-instance validation. Field order matches the heatmap query.
+    """
+    latitude: float
+    longitude: float
+    weight: float = 1.0
+    violation_type: str = ""
+    severity: str = ""
+    date: Optional[datetime] = None
+
 class ViolationStats(BaseModel):
     """Statistics about violations"""
     total: int = Field(..., description="Total number of violations")
@@ -67,7 +81,7 @@ class PublicStats(BaseModel):
 class LeaderboardUser(BaseModel):
     """User ranking on the leaderboard"""
     user_id: str = Field(..., description="User ID")
-    username: str = Field(..., description="Display name")
+    username: Optional[str] = Field(None, description="Display name (users.full_name, which may be unset)")
     score: int = Field(..., description="Total points")
     reports: int = Field(..., description="Number of reports submitted")
     rank: int = Field(..., description="Current ranking position")
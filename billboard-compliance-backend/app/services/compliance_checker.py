@@ -1,15 +1,75 @@
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime
+from collections import OrderedDict
+from itertools import product
+import hashlib
 import logging
-from ..config.compliance_rules import ComplianceConfig, ZoneType, BillboardType
+import threading
+import numpy as np
+import orjson
+from ..config.compliance_rules import (
+    AdministrativeRequirement, BillboardType, ComplianceConfig, ContentRestriction,
+    LocationRestriction, SafetyRequirement, SizeRestriction, ZoneType
+)
 from ..models import Billboard, ViolationType
 
+# Violation type reported for each rule class
+_RULE_TYPE_MAP: Dict[type, ViolationType] = {
+    SizeRestriction: ViolationType.SIZE_VIOLATION,
+    LocationRestriction: ViolationType.LOCATION_VIOLATION,
+    ContentRestriction: ViolationType.CONTENT_VIOLATION,
+    SafetyRequirement: ViolationType.STRUCTURAL_ISSUE,
+    AdministrativeRequirement: ViolationType.UNAUTHORIZED,
+}
+
+# Number of compliance results kept per ComplianceChecker
+CHECK_CACHE_SIZE = 4096
+
+def _check_key(billboard: Billboard, report_data: Dict, today: date) -> Tuple:
+    """Cache key for a compliance check.
+    
+    Built from a snapshot of the billboard fields the checks read plus a
+    digest of the report data, so the cache holds no references to the
+    billboard or the report themselves.
+    """
+    snapshot = (
+        billboard.id,
+        billboard.zone_type,
+        billboard.billboard_type,
+        billboard.width_meters,
+        billboard.height_meters,
+        billboard.structural_certificate_id,
+        billboard.permit_number,
+        getattr(billboard, 'permit_expiry_date', None),
+    )
+    report_digest = hashlib.blake2b(
+        orjson.dumps(report_data, default=str, option=orjson.OPT_SORT_KEYS),
+        digest_size=16
+    ).digest()
+    return (snapshot, report_digest, today)
+
+def _copy_violation(violation: Dict) -> Dict:
+    """Copy a cached violation so callers can't modify the cached one."""
+    return {**violation, "details": dict(violation["details"])}
+
 class ComplianceChecker:
     """Service for checking billboard compliance against regulations."""
     
     def __init__(self, config: Optional[ComplianceConfig] = None):
         self.config = config or self._load_default_config()
         self.logger = logging.getLogger(__name__)
+        
+        # Resolve the rules for every (zone, billboard type) up front
+        self._rule_cache: Dict[Tuple[ZoneType, BillboardType], Dict[str, List]] = {
+            (zone, billboard_type): self.config.get_applicable_rules(zone, billboard_type)
+            for zone, billboard_type in product(ZoneType, BillboardType)
+        }
+        
+        # Checks are pure functions of the billboard, the report and the date,
+        # so repeated requests for an unchanged billboard are served from this
+        # LRU cache of _check_key -> violations
+        self._check_cache: "OrderedDict[Tuple, Tuple[Dict, ...]]" = OrderedDict()
+        self._check_cache_lock = threading.Lock()
     
     def _load_default_config(self) -> ComplianceConfig:
         from ..config.compliance_rules import load_default_config
@@ -18,24 +78,13 @@ class ComplianceChecker:
     def check_billboard_compliance(self, billboard: Billboard, report_data: Dict) -> Dict:
         """Check if a billboard is compliant with all regulations."""
         try:
-            zone = ZoneType(billboard.zone_type.lower())
-            billboard_type = BillboardType(billboard.billboard_type.lower())
-            
-            # Get applicable rules
-            rules = self.config.get_applicable_rules(zone, billboard_type)
-            
-            # Check each compliance category
-            violations = []
-            violations.extend(self._check_size(billboard, rules["size"]))
-            violations.extend(self._check_location(billboard, report_data, rules["location"]))
-            violations.extend(self._check_content(billboard, report_data, rules["content"]))
-            violations.extend(self._check_safety(billboard, rules["safety"]))
-            violations.extend(self._check_administrative(billboard, rules["administrative"]))
+            now = datetime.utcnow()
+            violations = self._cached_violations(billboard, report_data, now.date())
             
             return {
                 "is_compliant": len(violations) == 0,
-                "violations": violations,
-                "checked_at": datetime.utcnow().isoformat(),
+                "violations": [_copy_violation(v) for v in violations],
+                "checked_at": now.isoformat(),
                 "billboard_id": str(billboard.id)
             }
             
@@ -43,6 +92,110 @@ class ComplianceChecker:
             self.logger.error(f"Compliance check failed: {str(e)}")
             raise
     
+    def _cached_violations(self, billboard: Billboard, report_data: Dict, today: date) -> Tuple[Dict, ...]:
+        """Return the cached violations for this check, evaluating on a miss.
+        
+        The cached dicts are shared; callers must copy them before handing
+        them out.
+        """
+        key = _check_key(billboard, report_data, today)
+        with self._check_cache_lock:
+            violations = self._check_cache.get(key)
+            if violations is not None:
+                self._check_cache.move_to_end(key)
+                return violations
+        
+        violations = self._evaluate(billboard, report_data, today)
+        with self._check_cache_lock:
+            self._check_cache[key] = violations
+            if len(self._check_cache) > CHECK_CACHE_SIZE:
+                self._check_cache.popitem(last=False)
+        return violations
+    
+    def _evaluate(self, billboard: Billboard, report_data: Dict, today: date) -> Tuple[Dict, ...]:
+        """Run every compliance category for the billboard and report."""
+        zone = ZoneType(billboard.zone_type.lower())
+        billboard_type = BillboardType(billboard.billboard_type.lower())
+        
+        # Get applicable rules
+        rules = self._rule_cache[(zone, billboard_type)]
+        
+        # Check each compliance category
+        violations = []
+        violations.extend(self._check_size(billboard, rules["size"]))
+        violations.extend(self._check_location(billboard, report_data, rules["location"]))
+        violations.extend(self._check_content(billboard, report_data, rules["content"]))
+        violations.extend(self._check_safety(billboard, rules["safety"]))
+        violations.extend(self._check_administrative(billboard, rules["administrative"], today))
+        return tuple(violations)
+    
+    def check_batch(self, billboards: List[Billboard], report_data: List[Dict]) -> List[Dict]:
+        """Check many billboards at once, e.g. for a nightly audit.
+        
+        Size rules are evaluated with NumPy over every billboard sharing a
+        (zone, billboard type); the remaining checks run per billboard.
+        Results match check_billboard_compliance, in input order.
+        """
+        try:
+            now = datetime.utcnow()
+            today = now.date()
+            checked_at = now.isoformat()
+            
+            # Group billboards by the rule set that applies to them
+            groups: Dict[tuple, List[int]] = {}
+            for i, billboard in enumerate(billboards):
+                key = (ZoneType(billboard.zone_type.lower()), BillboardType(billboard.billboard_type.lower()))
+                groups.setdefault(key, []).append(i)
+            
+            violations: List[List[Dict]] = [[] for _ in billboards]
+            for (zone, billboard_type), indices in groups.items():
+                rules = self._rule_cache[(zone, billboard_type)]
+                
+                size_violations = self._check_size_batch([billboards[i] for i in indices], rules["size"])
+                for i, found in zip(indices, size_violations):
+                    billboard = billboards[i]
+                    found.extend(self._check_location(billboard, report_data[i], rules["location"]))
+                    found.extend(self._check_content(billboard, report_data[i], rules["content"]))
+                    found.extend(self._check_safety(billboard, rules["safety"]))
+                    found.extend(self._check_administrative(billboard, rules["administrative"], today))
+                    violations[i] = found
+            
+            return [
+                {
+                    "is_compliant": len(found) == 0,
+                    "violations": found,
+                    "checked_at": checked_at,
+                    "billboard_id": str(billboard.id)
+                }
+                for billboard, found in zip(billboards, violations)
+            ]
+            
+        except Exception as e:
+            self.logger.error(f"Batch compliance check failed: {str(e)}")
+            raise
+    
+    def _check_size_batch(self, billboards: List[Billboard], rules: List) -> List[List[Dict]]:
+        """Check size compliance for several billboards with vectorized comparisons."""
+        violations: List[List[Dict]] = [[] for _ in billboards]
+        if not rules or not billboards:
+            return violations
+        
+        count = len(billboards)
+        widths = np.fromiter((b.width_meters for b in billboards), dtype=float, count=count)
+        heights = np.fromiter((b.height_meters for b in billboards), dtype=float, count=count)
+        areas = widths * heights
+        
+        for rule in rules:
+            checks = (
+                (widths > rule.max_width_meters, "Width exceeds maximum allowed"),
+                (heights > rule.max_height_meters, "Height exceeds maximum allowed"),
+                (areas > rule.max_area_sqm, "Area exceeds maximum allowed"),
+            )
+            for exceeded, message in checks:
+                for i in np.flatnonzero(exceeded):
+                    violations[i].append(self._create_violation(rule, message))
+        return violations
+    
     def _check_size(self, billboard: Billboard, rules: List) -> List[Dict]:
         """Check size compliance."""
         violations = []
@@ -71,10 +224,17 @@ class ComplianceChecker:
         if 'content_analysis' not in report_data:
             return violations
             
+        detected = report_data['content_analysis'].get('detected_content') or {}
+        if not detected:
+            return violations
+        
         for rule in rules:
-            content = report_data['content_analysis']
+            hits = rule.prohibited_content_set.intersection(detected)
+            if not hits:
+                continue
+            # Report hits in the rule's own order
             for prohibited in rule.prohibited_content:
-                if prohibited in content.get('detected_content', {}):
+                if prohibited in hits:
                     violations.append(self._create_violation(rule, f"Prohibited content: {prohibited}"))
         return violations
     
@@ -86,13 +246,17 @@ class ComplianceChecker:
                 violations.append(self._create_violation(rule, "Missing structural certificate"))
         return violations
     
-    def _check_administrative(self, billboard: Billboard, rules: List) -> List[Dict]:
+    def _check_administrative(self, billboard: Billboard, rules: List, today: Optional[date] = None) -> List[Dict]:
         """Check administrative compliance."""
         violations = []
+        if today is None:
+            today = datetime.utcnow().date()
+        expiry = getattr(billboard, 'permit_expiry_date', None)
+        expired = expiry is not None and expiry < today
         for rule in rules:
             if rule.requires_permit and not billboard.permit_number:
                 violations.append(self._create_violation(rule, "Missing permit"))
-            if hasattr(billboard, 'permit_expiry_date') and billboard.permit_expiry_date < datetime.utcnow().date():
+            if expired:
                 violations.append(self._create_violation(rule, "Permit expired"))
         return violations
     
@@ -100,22 +264,8 @@ class ComplianceChecker:
         """Helper to create a violation dictionary."""
         return {
             "rule_id": rule.rule_id,
-            "type": self._map_rule_to_violation_type(rule),
+            "type": _RULE_TYPE_MAP.get(type(rule), ViolationType.UNAUTHORIZED),
             "severity": rule.severity,
             "message": message,
             "details": {"rule_description": rule.description}
         }
-    
-    def _map_rule_to_violation_type(self, rule) -> str:
-        """Map rule type to violation type."""
-        rule_name = rule.__class__.__name__.lower()
-        if 'size' in rule_name:
-            return ViolationType.SIZE_VIOLATION
-        elif 'location' in rule_name:
-            return ViolationType.LOCATION_VIOLATION
-        elif 'content' in rule_name:
-            return ViolationType.CONTENT_VIOLATION
-        elif 'safety' in rule_name:
-            return ViolationType.SAFETY_VIOLATION
-        else:
-            return ViolationType.ADMINISTRATIVE_VIOLATION
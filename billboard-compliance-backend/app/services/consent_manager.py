@@ -1,10 +1,53 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from types import MappingProxyType
+from typing import Dict, Final, List, Mapping, Optional, Any, Set, Tuple
+from sqlalchemy import column, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from .. import models
 from ..schemas.consent import ConsentCreate, ConsentUpdate, ConsentStatus
 from ..utils.audit_logger import AuditLogger, AuditAction
 
+# Consent requirements per feature. This could be loaded from a configuration
+# file or database; it is read-only so it is built once at import time.
+_CONSENT_REQUIREMENTS: Final[Mapping[str, Tuple[Mapping[str, Any], ...]]] = MappingProxyType({
+    "photo_upload": (
+        MappingProxyType({
+            "type": "privacy_policy",
+            "title": "Privacy Policy",
+            "description": "Agree to our privacy policy and data processing terms.",
+            "required": True,
+            "default_expiry_days": 365
+        }),
+        MappingProxyType({
+            "type": "location_tracking",
+            "title": "Location Services",
+            "description": "Allow us to access your location to tag reports with geolocation data.",
+            "required": False,
+            "default_expiry_days": 90
+        }),
+        MappingProxyType({
+            "type": "camera_access",
+            "title": "Camera Access",
+            "description": "Allow access to your camera to take photos of billboards.",
+            "required": True,
+            "default_expiry_days": 365
+        })
+    ),
+    "analytics": (
+        MappingProxyType({
+            "type": "usage_statistics",
+            "title": "Usage Statistics",
+            "description": "Allow us to collect anonymous usage statistics to improve our service.",
+            "required": False,
+            "default_expiry_days": 365
+        }),
+    )
+})
+
+# Fields refreshed when create_consent hits an existing active consent
+_CONSENT_UPSERT_FIELDS: Final[Tuple[str, ...]] = ("status", "expires_at", "version", "metadata")
+
 class ConsentManager:
     """
     Manages user consents and permissions for data processing.
@@ -20,6 +63,8 @@ class ConsentManager:
         """
         self.db = db
         self.audit_logger = audit_logger or AuditLogger(db)
+        # One timestamp per manager; FastAPI builds a manager per request
+        self._now = datetime.utcnow()
     
     def get_user_consents(
         self, 
@@ -43,7 +88,7 @@ class ConsentManager:
         if active_only:
             query = query.filter(
                 models.Consent.status == ConsentStatus.ACTIVE,
-                models.Consent.expires_at > datetime.utcnow()
+                models.Consent.expires_at > self._now
             )
             
         return query.all()
@@ -91,54 +136,82 @@ class ConsentManager:
         Returns:
             Created Consent object
         """
-        # Check for existing active consent of the same type
-        existing = self.db.query(models.Consent).filter(
-            models.Consent.user_id == user_id,
-            models.Consent.consent_type == consent_data.consent_type,
-            models.Consent.status == ConsentStatus.ACTIVE,
-            models.Consent.expires_at > datetime.utcnow()
-        ).first()
-        
-        if existing:
-            # Update existing consent
-            return self.update_consent(
-                consent_id=existing.id,
-                consent_data=ConsentUpdate(
-                    status=consent_data.status,
-                    expires_at=consent_data.expires_at,
-                    version=consent_data.version,
-                    metadata=consent_data.metadata
-                ),
-                user_id=user_id,
-                ip_address=ip_address,
-                user_agent=user_agent
-            )
-        
-        # Create new consent
-        db_consent = models.Consent(
-            **consent_data.dict(),
+        consents = models.Consent.__table__
+        values = consent_data.model_dump()
+        stmt = pg_insert(consents).values(
+            **values,
             user_id=user_id,
-            granted_at=datetime.utcnow(),
+            granted_at=self._now,
             ip_address=ip_address,
             user_agent=user_agent
         )
         
-        self.db.add(db_consent)
+        if values["status"] == ConsentStatus.ACTIVE:
+            # Insert, or refresh the user's active consent of the same type in
+            # place; relies on the partial unique index ux_consents_active
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[consents.c.user_id, consents.c.consent_type],
+                index_where=consents.c.status == literal_column(f"'{ConsentStatus.ACTIVE.value}'"),
+                set_={
+                    **{field: stmt.excluded[field] for field in _CONSENT_UPSERT_FIELDS},
+                    "updated_at": self._now
+                }
+            ).returning(*consents.c, literal_column("xmax = 0").label("inserted"))
+            
+            db_consent, inserted = self.db.execute(
+                select(models.Consent, column("inserted"))
+                .from_statement(stmt)
+                .execution_options(populate_existing=True)
+            ).one()
+        else:
+            # A non-active status can't conflict on the partial index, so move
+            # an existing active consent to it first and only insert if
+            # there is none
+            db_consent = self.db.execute(
+                select(models.Consent).from_statement(
+                    update(consents)
+                    .where(
+                        consents.c.user_id == user_id,
+                        consents.c.consent_type == consent_data.consent_type,
+                        consents.c.status == ConsentStatus.ACTIVE
+                    )
+                    .values(
+                        **{field: values[field] for field in _CONSENT_UPSERT_FIELDS},
+                        updated_at=self._now
+                    )
+                    .returning(*consents.c)
+                ).execution_options(populate_existing=True)
+            ).scalar_one_or_none()
+            inserted = db_consent is None
+            if inserted:
+                db_consent = self.db.execute(
+                    select(models.Consent).from_statement(stmt.returning(*consents.c))
+                ).scalar_one()
+        details = {
+            "consent_type": db_consent.consent_type,
+            "status": db_consent.status,
+            "version": db_consent.version
+        }
         self.db.commit()
-        self.db.refresh(db_consent)
         
         # Log the consent action
         if self.audit_logger:
+            if inserted:
+                action = AuditAction.CREATE
+            else:
+                # Only an active consent is ever updated here
+                action = AuditAction.UPDATE
+                details = {
+                    "previous_status": ConsentStatus.ACTIVE,
+                    "new_status": details["status"],
+                    "updated_fields": list(_CONSENT_UPSERT_FIELDS)
+                }
             self.audit_logger.log(
-                action=AuditAction.CREATE,
+                action=action,
                 resource_type="consent",
                 resource_id=str(db_consent.id),
                 user_id=user_id,
-                details={
-                    "consent_type": db_consent.consent_type,
-                    "status": db_consent.status,
-                    "version": db_consent.version
-                },
+                details=details,
                 ip_address=ip_address,
                 user_agent=user_agent
             )
@@ -166,22 +239,33 @@ class ConsentManager:
         Returns:
             Updated Consent object
         """
-        db_consent = self.get_consent(consent_id, user_id)
-        if not db_consent:
-            raise ValueError("Consent not found")
+        update_data = consent_data.model_dump(exclude_unset=True)
         
-        # Store previous values for audit
-        previous_status = db_consent.status
-        
-        # Update fields
-        update_data = consent_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_consent, field, value)
+        # Lock and read the current status in a CTE so the previous value for
+        # the audit log comes back from the same UPDATE ... RETURNING
+        previous = select(models.Consent.id, models.Consent.status).filter(
+            models.Consent.id == consent_id,
+            models.Consent.user_id == user_id
+        ).with_for_update().cte("previous")
         
-        db_consent.updated_at = datetime.utcnow()
+        consents = models.Consent.__table__
+        stmt = (
+            update(consents)
+            .where(consents.c.id == previous.c.id)
+            .values(**update_data, updated_at=self._now)
+            .returning(*consents.c, previous.c.status.label("previous_status"))
+        )
+        row = self.db.execute(
+            select(models.Consent, column("previous_status"))
+            .from_statement(stmt)
+            .execution_options(populate_existing=True)
+        ).one_or_none()
+        if row is None:
+            raise ValueError("Consent not found")
         
+        db_consent, previous_status = row
+        new_status = db_consent.status
         self.db.commit()
-        self.db.refresh(db_consent)
         
         # Log the update
         if self.audit_logger:
@@ -192,7 +276,7 @@ class ConsentManager:
                 user_id=user_id,
                 details={
                     "previous_status": previous_status,
-                    "new_status": db_consent.status,
+                    "new_status": new_status,
                     "updated_fields": list(update_data.keys())
                 },
                 ip_address=ip_address,
@@ -249,7 +333,7 @@ class ConsentManager:
             models.Consent.user_id == user_id,
             models.Consent.consent_type == consent_type,
             models.Consent.status == ConsentStatus.ACTIVE,
-            models.Consent.expires_at > datetime.utcnow()
+            models.Consent.expires_at > self._now
         )
         
         if not require_active:
@@ -259,11 +343,29 @@ class ConsentManager:
         
         return query.first() is not None
     
+    def _active_consent_types(self, user_id: int) -> Set[str]:
+        """
+        Get the consent types a user currently has active, in one query.
+        
+        Args:
+            user_id: ID of the user
+            
+        Returns:
+            Set of active consent types
+        """
+        rows = self.db.query(models.Consent.consent_type).filter(
+            models.Consent.user_id == user_id,
+            models.Consent.status == ConsentStatus.ACTIVE,
+            models.Consent.expires_at > self._now
+        ).all()
+        
+        return {consent_type for consent_type, in rows}
+    
     def get_required_consents(
         self,
         feature: str,
         version: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> Tuple[Mapping[str, Any], ...]:
         """
         Get the list of required consents for a specific feature.
         
@@ -272,45 +374,9 @@ class ConsentManager:
             version: Optional version of the feature
             
         Returns:
-            List of required consents with their descriptions
+            Read-only tuple of required consents with their descriptions
         """
-        # This could be loaded from a configuration file or database
-        CONSENT_REQUIREMENTS = {
-            "photo_upload": [
-                {
-                    "type": "privacy_policy",
-                    "title": "Privacy Policy",
-                    "description": "Agree to our privacy policy and data processing terms.",
-                    "required": True,
-                    "default_expiry_days": 365
-                },
-                {
-                    "type": "location_tracking",
-                    "title": "Location Services",
-                    "description": "Allow us to access your location to tag reports with geolocation data.",
-                    "required": False,
-                    "default_expiry_days": 90
-                },
-                {
-                    "type": "camera_access",
-                    "title": "Camera Access",
-                    "description": "Allow access to your camera to take photos of billboards.",
-                    "required": True,
-                    "default_expiry_days": 365
-                }
-            ],
-            "analytics": [
-                {
-                    "type": "usage_statistics",
-                    "title": "Usage Statistics",
-                    "description": "Allow us to collect anonymous usage statistics to improve our service.",
-                    "required": False,
-                    "default_expiry_days": 365
-                }
-            ]
-        }
-        
-        return CONSENT_REQUIREMENTS.get(feature, [])
+        return _CONSENT_REQUIREMENTS.get(feature, ())
     
     def check_feature_access(
         self, 
@@ -330,6 +396,7 @@ class ConsentManager:
             Dictionary with access information
         """
         required_consents = self.get_required_consents(feature, version)
+        active_types = self._active_consent_types(user_id)
         
         result = {
             "has_access": True,
@@ -340,16 +407,17 @@ class ConsentManager:
         for consent_req in required_consents:
             consent_type = consent_req["type"]
             is_required = consent_req.get("required", True)
+            granted = consent_type in active_types
             
             result["required_consents"].append({
                 "type": consent_type,
                 "title": consent_req.get("title", ""),
                 "description": consent_req.get("description", ""),
                 "required": is_required,
-                "granted": self.has_consent(user_id, consent_type)
+                "granted": granted
             })
             
-            if is_required and not self.has_consent(user_id, consent_type):
+            if is_required and not granted:
                 result["has_access"] = False
                 result["missing_consents"].append(consent_type)
         
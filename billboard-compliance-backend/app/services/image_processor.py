@@ -1,3 +1,4 @@
+import asyncio
 import cv2
 import numpy as np
 from typing import Dict, List, Optional
@@ -5,7 +6,48 @@ import logging
 from PIL import Image
 import io
 
+logger = logging.getLogger(__name__)
+
+# Optional libjpeg-turbo bindings (PyTurboJPEG) for faster JPEG encoding;
+# cv2.imencode is used when they or the shared library are unavailable
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _TURBOJPEG = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _TURBOJPEG = None
+
+# Quality for re-encoded JPEGs (OpenCV's default)
+JPEG_QUALITY = 95
+
+# Longest side of the input fed to the YuNet face detector (pixels)
+YUNET_INPUT_SIZE = 320
+
+# Smallest face (pixels, at processing resolution) that must be found and
+# blurred, and the detection window of the frontal-face Haar cascade
+FACE_MIN_SIZE = 30
+HAAR_WINDOW_SIZE = 24
+
+# Decode-time downscaling, largest factor first
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+def _load_face_cascade() -> Optional[cv2.CascadeClassifier]:
+    """Load the Haar face cascade, or None if OpenCV can't read it."""
+    cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+    )
+    if cascade.empty():
+        logger.error("Failed to load Haar face cascade; face blurring is unavailable")
+        return None
+    return cascade
+
 class ImageProcessor:
+    # Loaded once per process instead of re-parsing the XML for every image
+    _FACE_CASCADE = _load_face_cascade()
+    
     def __init__(self, config: Optional[Dict] = None):
         """
         Initialize the ImageProcessor with configuration.
@@ -20,8 +62,106 @@ class ImageProcessor:
             'blur_faces': True,  # Whether to blur faces in the image
             'blur_strength': 25,  # Strength of the blur (higher = more blur)
             'max_image_dimension': 2000,  # Maximum dimension for processing (pixels)
+            'face_detection_max_dimension': 640,  # Longest side used for Haar face detection (pixels)
+            'face_detector_model': None,  # Optional YuNet ONNX model; Haar cascade is used if unset
+            'face_detector_cuda': False,  # Run YuNet on the OpenCV DNN CUDA backend
         }
         self.logger = logging.getLogger(__name__)
+        self._yunet = self._create_yunet()
+
+    def _create_yunet(self):
+        """
+        Create a YuNet DNN face detector if a model file is configured.
+        
+        Returns:
+            cv2.FaceDetectorYN instance, or None to fall back to the Haar cascade
+        """
+        model_path = self.config.get('face_detector_model')
+        if not model_path:
+            return None
+        if not hasattr(cv2, 'FaceDetectorYN'):
+            self.logger.warning("cv2.FaceDetectorYN requires OpenCV >= 4.5.4; using Haar cascade")
+            return None
+        
+        try:
+            detector = cv2.FaceDetectorYN.create(model_path, '', (YUNET_INPUT_SIZE, YUNET_INPUT_SIZE))
+            if self.config.get('face_detector_cuda'):
+                detector.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+                detector.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+            return detector
+        except cv2.error as e:
+            self.logger.error(f"Error loading YuNet face detector: {str(e)}")
+            return None
+
+    def _detect_faces(self, image: np.ndarray, gray: Optional[np.ndarray] = None) -> List:
+        """
+        Detect faces in the image.
+        
+        Args:
+            image: Input image as a numpy array (BGR)
+            gray: Optional grayscale version of the image, reused if given
+            
+        Returns:
+            List of face boxes as (x, y, w, h) in image coordinates
+        """
+        if self._yunet is not None:
+            # YuNet runs one forward pass on a small fixed-size input
+            h, w = image.shape[:2]
+            scale = min(1.0, YUNET_INPUT_SIZE / max(h, w))
+            small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else image
+            self._yunet.setInputSize((small.shape[1], small.shape[0]))
+            _, faces = self._yunet.detect(small)
+            if faces is None:
+                return []
+            return [tuple(int(v / scale) for v in face[:4]) for face in faces]
+        
+        if self._FACE_CASCADE is None:
+            raise RuntimeError("Face detector is not available")
+        
+        # Convert to grayscale for face detection
+        if gray is None:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        
+        # Haar cost grows with the pixel count, so detect on a copy no larger
+        # than face_detection_max_dimension. The cascade cannot see anything
+        # below its window, so on large images the smallest face found is
+        # HAAR_WINDOW_SIZE / scale pixels rather than FACE_MIN_SIZE.
+        h, w = gray.shape[:2]
+        scale = min(1.0, self.config.get('face_detection_max_dimension', 640) / max(h, w))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        min_face = max(HAAR_WINDOW_SIZE, round(FACE_MIN_SIZE * scale))
+        
+        faces = self._FACE_CASCADE.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(min_face, min_face)
+        )
+        return [tuple(int(v / scale) for v in face) for face in faces]
+
+    def _decode_flag(self, image_data: bytes, max_dim: int) -> int:
+        """
+        Pick an imdecode flag that lets libjpeg scale the image down while decoding.
+        
+        Args:
+            image_data: Binary image data
+            max_dim: Maximum dimension the image will be resized to
+            
+        Returns:
+            The largest IMREAD_REDUCED_COLOR_* flag that keeps the image at
+            least max_dim on its longest side, or IMREAD_COLOR
+        """
+        try:
+            # Only the header is read here; PIL decodes pixels lazily
+            longest = max(Image.open(io.BytesIO(image_data)).size)
+        except Exception:
+            return cv2.IMREAD_COLOR
+        
+        for factor, flag in _REDUCED_DECODE_FLAGS:
+            if longest // factor >= max_dim:
+                return flag
+        return cv2.IMREAD_COLOR
 
     def preprocess_image(self, image_data: bytes) -> np.ndarray:
         """
@@ -34,13 +174,14 @@ class ImageProcessor:
             Preprocessed image as a numpy array
         """
         try:
+            max_dim = self.config['max_image_dimension']
+            
             # Convert bytes to numpy array
             nparr = np.frombuffer(image_data, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            img = cv2.imdecode(nparr, self._decode_flag(image_data, max_dim))
             
-            # Resize if too large (for performance)
+            # Resize if still too large (for performance)
             h, w = img.shape[:2]
-            max_dim = self.config['max_image_dimension']
             if max(h, w) > max_dim:
                 scale = max_dim / max(h, w)
                 img = cv2.resize(img, (int(w * scale), int(h * scale)))
@@ -50,12 +191,19 @@ class ImageProcessor:
             self.logger.error(f"Error preprocessing image: {str(e)}")
             raise
 
-    def protect_privacy(self, image: np.ndarray) -> np.ndarray:
+    def protect_privacy(
+        self,
+        image: np.ndarray,
+        gray: Optional[np.ndarray] = None,
+        in_place: bool = True
+    ) -> np.ndarray:
         """
         Apply privacy protections to the image.
         
         Args:
             image: Input image as a numpy array
+            gray: Optional grayscale version of the image, reused for face detection
+            in_place: Blur faces directly in `image`; pass False to keep the original intact
             
         Returns:
             Image with privacy protections applied
@@ -63,21 +211,10 @@ class ImageProcessor:
         if not self.config['blur_faces']:
             return image
             
-        # Convert to grayscale for face detection
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Load the pre-trained face detector
-        face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
-        
         # Detect faces
-        faces = face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(30, 30)
-        )
+        faces = self._detect_faces(image, gray)
+        if len(faces) and not in_place:
+            image = image.copy()
         
         # Blur detected faces
         for (x, y, w, h) in faces:
@@ -98,24 +235,27 @@ class ImageProcessor:
             
         return image
 
-    def detect_billboards(self, image: np.ndarray) -> List[Dict]:
+    def detect_billboards(self, image: np.ndarray, gray: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Detect billboards in the image.
         
         Args:
             image: Input image as a numpy array
+            gray: Optional grayscale version of the image, reused if given
             
         Returns:
             List of detected billboards with their properties
         """
         try:
             # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            if gray is None:
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             
             # Apply edge detection
             edges = cv2.Canny(gray, 50, 150, apertureSize=3)
             
-            # Find contours
+            # Find contours, nested ones included: a billboard is often
+            # inside a larger outline (frame, building edge, poster border)
             contours, _ = cv2.findContours(
                 edges, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE
             )
@@ -125,29 +265,34 @@ class ImageProcessor:
             max_area = self.config['max_billboard_area']
             
             for contour in contours:
+                # Reject by area first; most contours in outdoor photos are small noise
+                area = cv2.contourArea(contour)
+                if not min_area < area < max_area:
+                    continue
+                
                 # Approximate the contour
                 epsilon = 0.02 * cv2.arcLength(contour, True)
                 approx = cv2.approxPolyDP(contour, epsilon, True)
                 
                 # Check if it's a quadrilateral (4 sides)
-                if len(approx) == 4:
-                    area = cv2.contourArea(contour)
-                    if min_area < area < max_area:
-                        x, y, w, h = cv2.boundingRect(contour)
-                        
-                        # Calculate aspect ratio (billboards are typically wider than tall)
-                        aspect_ratio = float(w) / h
-                        
-                        # Basic confidence calculation
-                        confidence = min(1.0, area / max_area * 0.8 + 0.2)
-                        
-                        if confidence >= self.config['confidence_threshold']:
-                            detected.append({
-                                'bbox': [int(x), int(y), int(w), int(h)],
-                                'area': float(area),
-                                'aspect_ratio': float(aspect_ratio),
-                                'confidence': float(confidence)
-                            })
+                if len(approx) != 4:
+                    continue
+                
+                x, y, w, h = cv2.boundingRect(contour)
+                
+                # Calculate aspect ratio (billboards are typically wider than tall)
+                aspect_ratio = float(w) / h
+                
+                # Basic confidence calculation
+                confidence = min(1.0, area / max_area * 0.8 + 0.2)
+                
+                if confidence >= self.config['confidence_threshold']:
+                    detected.append({
+                        'bbox': [int(x), int(y), int(w), int(h)],
+                        'area': float(area),
+                        'aspect_ratio': float(aspect_ratio),
+                        'confidence': float(confidence)
+                    })
             
             return detected
             
@@ -169,11 +314,14 @@ class ImageProcessor:
             # Preprocess the image
             image = self.preprocess_image(image_data)
             
-            # Apply privacy protections
-            protected_image = self.protect_privacy(image.copy())
+            # Convert to grayscale once for both face and billboard detection
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            
+            # Apply privacy protections (in place; the original isn't needed afterwards)
+            self.protect_privacy(image, gray)
             
             # Detect billboards
-            billboards = self.detect_billboards(protected_image)
+            billboards = self.detect_billboards(image, gray)
             
             # Prepare result
             result = {
@@ -192,20 +340,37 @@ class ImageProcessor:
             self.logger.error(f"Error processing image: {str(e)}")
             raise
 
-    def draw_detections(self, image: np.ndarray, detections: List[Dict]) -> bytes:
+    async def process_image_async(self, image_data: bytes) -> Dict:
+        """
+        Run process_image in a worker thread so it doesn't block the event loop.
+        
+        OpenCV releases the GIL in decoding, resizing and detection, so the
+        default thread pool gives real parallelism without forking the
+        process (and its database pools) the way a process pool would.
+        
+        Args:
+            image_data: Binary image data
+            
+        Returns:
+            Dictionary containing processing results
+        """
+        return await asyncio.to_thread(self.process_image, image_data)
+
+    def draw_detections(self, image: np.ndarray, detections: List[Dict], in_place: bool = False) -> bytes:
         """
         Draw detection boxes on the image.
         
         Args:
             image: Input image as a numpy array
             detections: List of detections from detect_billboards()
+            in_place: Draw directly on `image` instead of a copy
             
         Returns:
             Image with detections drawn as bytes (JPEG format)
         """
         try:
-            # Create a copy of the image to draw on
-            img_draw = image.copy()
+            # Only copy when the caller still needs the original image
+            img_draw = image if in_place or not detections else image.copy()
             
             for det in detections:
                 x, y, w, h = det['bbox']
@@ -224,7 +389,9 @@ class ImageProcessor:
                 )
             
             # Convert back to bytes
-            _, buffer = cv2.imencode('.jpg', img_draw)
+            if _TURBOJPEG is not None:
+                return _TURBOJPEG.encode(img_draw, quality=JPEG_QUALITY, pixel_format=TJPF_BGR)
+            _, buffer = cv2.imencode('.jpg', img_draw, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
             return buffer.tobytes()
             
         except Exception as e:
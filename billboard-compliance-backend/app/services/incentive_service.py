@@ -1,12 +1,24 @@
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+import orjson
+from sqlalchemy import Integer, cast, func, literal_column, select, text, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session
 from .. import models, schemas
-from ..core.config import settings
+from ..cache import REWARDS_EXPIRE, get_cached, rewards_key, set_cached
+from ..database import json_dumps
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Latest reports attached to each user by get_leaderboard_with_recent
+RECENT_REPORTS_PER_USER = 3
+
+def _thaw_tier(tier: Mapping) -> Dict:
+    """Copy a frozen tier into a plain dict for callers."""
+    return {**tier, 'benefits': list(tier['benefits'])}
+
 class IncentiveService:
     """Service for managing user incentives and gamification"""
     
@@ -44,137 +56,162 @@ class IncentiveService:
         }
     ]
     
+    # Tier lookup tables; REWARD_TIERS is sorted by points_required. The
+    # tiers are read-only so the same objects can be handed to every caller.
+    _TIER_THRESHOLDS = tuple(t['points_required'] for t in REWARD_TIERS)
+    _FROZEN_TIERS = tuple(
+        MappingProxyType({
+            'name': t['name'],
+            'points_required': t['points_required'],
+            'benefits': tuple(t['benefits']),
+            'index': i,
+        })
+        for i, t in enumerate(REWARD_TIERS)
+    )
+    
     def __init__(self, db: Session):
         self.db = db
     
     async def award_points(self, user_id: str, action: str, metadata: Optional[Dict] = None) -> int:
-        """Award points to a user for an action"""
+        """Award points to a user for an action
+        
+        The streak check, the ledger insert and the user counters are all
+        handled by the award_points() database function in one round trip
+        (database/migrations/015 and 017). It returns the user's new totals, which refresh the cached rewards.
+        """
         if action not in self.POINTS:
             logger.warning(f"Unknown action for points: {action}")
             return 0
-            
-        points = self.POINTS[action]
-        
-        # Check for streak bonus
-        if action == 'report_submitted':
-            streak = await self._check_streak(user_id)
-            if streak > 1:  # Only award bonus after first day
-                points += streak * self.POINTS['streak_bonus']
-        
-        # Create point record
-        point_record = models.UserPoints(
-            user_id=user_id,
-            points=points,
-            action=action,
-            metadata=metadata or {}
-        )
-        self.db.add(point_record)
+        
+        row = self.db.execute(
+            text(
+                "SELECT * FROM award_points(:user_id, :action, :points, :streak_bonus, "
+                "CAST(:metadata AS jsonb))"
+            ),
+            {
+                'user_id': user_id,
+                'action': action,
+                'points': self.POINTS[action],
+                'streak_bonus': self.POINTS['streak_bonus'],
+                'metadata': json_dumps(metadata or {}),
+            }
+        ).one_or_none()
+        if row is None:
+            # No such user: the function's UPDATE matched nothing, so
+            # discard the ledger row it inserted
+            self.db.rollback()
+            raise ValueError("User not found")
+        
+        awarded, total_points, streak_days = row
         self.db.commit()
         
-        # Update user's total points
-        user = self.db.query(models.User).filter(models.User.id == user_id).first()
-        if user:
-            user.total_points = (user.total_points or 0) + points
-            self.db.commit()
+        rewards = self._build_rewards(total_points, streak_days)
+        await set_cached(
+            rewards_key(user_id), orjson.dumps(rewards), REWARDS_EXPIRE
+        )
         
-        return points
-    
-    async def _check_streak(self, user_id: str) -> int:
-        """Check and update user's reporting streak"""
-        # Get last report date
-        last_report = self.db.query(models.UserPoints).filter(
-            models.UserPoints.user_id == user_id,
-            models.UserPoints.action == 'report_submitted'
-        ).order_by(models.UserPoints.created_at.desc()).first()
-        
-        if not last_report:
-            return 1  # First report
-            
-        # Check if last report was yesterday (within 36 hours to be lenient)
-        time_since_last = datetime.utcnow() - last_report.created_at
-        if time_since_last < timedelta(hours=36):
-            # Already got points for today
-            return 0
-            
-        # Check if we should continue streak (within 48 hours)
-        if time_since_last < timedelta(hours=48):
-            user = self.db.query(models.User).filter(models.User.id == user_id).first()
-            if user:
-                user.streak_days = (user.streak_days or 0) + 1
-                self.db.commit()
-                return user.streak_days
-        
-        # Reset streak if more than 48 hours
-        user = self.db.query(models.User).filter(models.User.id == user_id).first()
-        if user:
-            user.streak_days = 1
-            self.db.commit()
-        return 1
+        return awarded
     
     async def get_leaderboard(self, limit: int = 100) -> List[schemas.LeaderboardUser]:
-        """Get leaderboard of top users"""
-        # Get users with their report counts and points
-        users = self.db.query(
-            models.User.id,
-            models.User.username,
-            models.User.total_points,
-            models.func.count(models.Report.id).label('report_count')
-        ).outerjoin(
-            models.Report,
-            models.User.id == models.Report.user_id
-        ).group_by(
-            models.User.id
-        ).order_by(
-            models.User.total_points.desc()
-        ).limit(limit).all()
-        
-        # Convert to leaderboard format
-        leaderboard = []
-        for rank, user in enumerate(users, 1):
-            leaderboard.append(schemas.LeaderboardUser(
-                user_id=user.id,
-                username=user.username,
-                score=user.total_points or 0,
-                reports=user.report_count or 0,
-                rank=rank
-            ))
+        """Get leaderboard of top users
+        
+        Reads the precomputed leaderboard_mv, so rankings can lag behind
+        by up to one refresh interval.
+        """
+        leaderboard = models.leaderboard_mv
+        rows = self.db.execute(
+            select(leaderboard).order_by(leaderboard.c.rank).limit(limit)
+        ).mappings()
+        
+        return [schemas.LeaderboardUser(**row) for row in rows]
+    
+    async def get_leaderboard_with_recent(self, limit: int = 100) -> List[Dict]:
+        """Get the leaderboard with each user's latest reports
+        
+        A LATERAL subquery picks the latest reports per user and json_agg
+        folds them into one column, so the whole result is a single query
+        instead of one report query per user.
+        
+        Args:
+            limit: Number of users to return
             
-        return leaderboard
+        Returns:
+            LeaderboardUser fields plus 'recent_reports', a list of
+            {'id', 'created_at'} dicts, newest first
+        """
+        leaderboard = models.leaderboard_mv
+        Report = models.Report
+        
+        # Rank first so the lateral lookup only runs for the returned users
+        top = (
+            select(leaderboard).order_by(leaderboard.c.rank).limit(limit)
+        ).subquery('top')
+        recent = (
+            select(Report.id, Report.created_at)
+            .where(Report.reporter_id == cast(top.c.user_id, Integer))
+            .order_by(Report.created_at.desc())
+            .limit(RECENT_REPORTS_PER_USER)
+            .lateral("recent")
+        )
+        recent_reports = func.coalesce(
+            func.json_agg(aggregate_order_by(
+                func.json_build_object('id', recent.c.id, 'created_at', recent.c.created_at),
+                recent.c.created_at.desc()
+            )).filter(recent.c.id.isnot(None)),
+            literal_column("'[]'::json")
+        ).label('recent_reports')
+        
+        stmt = (
+            select(*top.c, recent_reports)
+            .select_from(top)
+            .outerjoin(recent, true())
+            .group_by(*top.c)
+            .order_by(top.c.rank)
+        )
+        
+        return [dict(row) for row in self.db.execute(stmt).mappings()]
     
     async def get_user_rewards(self, user_id: str) -> Dict:
-        """Get user's rewards and progress"""
+        """Get user's rewards and progress
+        
+        Cached per user in Redis; award_points rewrites the entry when the
+        user's points change.
+        """
+        key = rewards_key(user_id)
+        cached = await get_cached(key)
+        if cached:
+            return orjson.loads(cached)
+        
         user = self.db.query(models.User).filter(models.User.id == user_id).first()
         if not user:
             return {}
-            
-        current_points = user.total_points or 0
+        
+        rewards = self._build_rewards(user.total_points, user.streak_days)
+        await set_cached(key, orjson.dumps(rewards), REWARDS_EXPIRE)
+        return rewards
+    
+    def _build_rewards(self, total_points: Optional[int], streak_days: Optional[int]) -> Dict:
+        """Build the rewards summary for a user's points and streak
+        
+        Tiers are returned as plain dicts and lists, the same shape a cache
+        hit decodes to.
+        """
+        current_points = total_points or 0
         current_tier = self._get_tier_for_points(current_points)
-        next_tier = self.REWARD_TIERS[current_tier['index'] + 1] if current_tier['index'] < len(self.REWARD_TIERS) - 1 else None
+        next_tier = self._FROZEN_TIERS[current_tier['index'] + 1] if current_tier['index'] < len(self._FROZEN_TIERS) - 1 else None
         
         return {
-            'current_tier': current_tier,
-            'next_tier': next_tier,
+            'current_tier': _thaw_tier(current_tier),
+            'next_tier': _thaw_tier(next_tier) if next_tier else None,
             'points_to_next': next_tier['points_required'] - current_points if next_tier else 0,
             'current_points': current_points,
-            'streak_days': user.streak_days or 0
+            'streak_days': streak_days or 0
         }
     
-    def _get_tier_for_points(self, points: int) -> Dict:
-        """Get the tier for a given number of points"""
-        tier = {
-            'name': 'Citizen',
-            'points_required': 0,
-            'benefits': [],
-            'index': 0
-        }
-        
-        for idx, t in enumerate(self.REWARD_TIERS):
-            if points >= t['points_required']:
-                tier = {**t, 'index': idx}
-            else:
-                break
-                
-        return tier
+    def _get_tier_for_points(self, points: int) -> Mapping:
+        """Get the (read-only) tier for a given number of points"""
+        idx = bisect_right(self._TIER_THRESHOLDS, points) - 1
+        return self._FROZEN_TIERS[max(idx, 0)]
     
     async def create_weekly_challenge(self):
         """Create weekly challenges for users"""
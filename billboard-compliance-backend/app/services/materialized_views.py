@@ -0,0 +1,40 @@
+from typing import Iterable, Optional
+import logging
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+class MaterializedViewService:
+    """Service for refreshing the reporting materialized views"""
+    
+    # Views served by the public endpoints; each has a unique index so it
+    # can be refreshed without blocking readers.
+    VIEWS = (
+        'heatmap_cells',
+        'leaderboard_mv',
+    )
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def refresh(self, views: Optional[Iterable[str]] = None) -> None:
+        """Refresh the given views (all of them by default).
+        
+        This is meant to be called by a scheduled task (cron/APScheduler).
+        """
+        for view in views or self.VIEWS:
+            if view not in self.VIEWS:
+                raise ValueError(f"Unknown materialized view: {view}")
+            logger.info(f"Refreshing materialized view {view}")
+            self.db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+            self.db.commit()
+
+if __name__ == "__main__":
+    from ..database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        MaterializedViewService(db).refresh()
+    finally:
+        db.close()
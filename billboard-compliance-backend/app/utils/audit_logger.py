@@ -1,9 +1,23 @@
+import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Set
 from enum import Enum
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
 from .. import models
+from ..database import AuditSessionLocal, json_dumps
+
+logger = logging.getLogger('audit')
+
+# Buffered audit writes: queue bound, rows per INSERT and max wait (seconds)
+AUDIT_QUEUE_SIZE = 10_000
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 0.2
+
+# Queued by AuditLogWriter.stop to tell the flush task to finish up
+_STOP = object()
 
 class AuditAction(str, Enum):
     """Enumeration of possible audit actions"""
@@ -18,22 +32,152 @@ class AuditAction(str, Enum):
     ACCESS_DENIED = "access_denied"
     ERROR = "error"
 
+class AuditLogWriter:
+    """
+    Buffers audit log rows and writes them in batches from a background task.
+    
+    Each flush is one multi-row INSERT and one commit instead of a commit per
+    event. Rows are only buffered while the writer is running; otherwise (or
+    when the queue is full) AuditLogger writes them directly.
+    """
+    
+    def __init__(self, session_factory: Callable[[], Session] = AuditSessionLocal):
+        self.session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        # Direct writes for rows that found the queue full
+        self._overflow: Set[asyncio.Task] = set()
+    
+    async def start(self) -> None:
+        """Start the flush task on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=AUDIT_QUEUE_SIZE)
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the flush task once everything queued so far is written."""
+        if self._task is None:
+            return
+        # New rows go straight to the database from here on
+        self._loop = None
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        
+        # Rows handed over from other threads after the sentinel
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for start in range(0, len(remaining), AUDIT_BATCH_SIZE):
+            await asyncio.to_thread(self._write, remaining[start:start + AUDIT_BATCH_SIZE])
+        
+        if self._overflow:
+            await asyncio.gather(*self._overflow)
+    
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """
+        Queue a row for the next batch.
+        
+        Safe to call from the event loop or from worker threads.
+        
+        Args:
+            row: Column values for one AuditLog row
+            
+        Returns:
+            bool: False if the row was not queued and must be written directly
+        """
+        loop = self._loop
+        if loop is None or self._queue.full():
+            return False
+        
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        
+        if on_loop:
+            self._queue.put_nowait(row)
+        else:
+            loop.call_soon_threadsafe(self._put, row)
+        return True
+    
+    def _put(self, row: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            # Raced with other producers after the full() check; write it
+            # off the event loop
+            task = asyncio.create_task(asyncio.to_thread(self._write, [row]))
+            self._overflow.add(task)
+            task.add_done_callback(self._overflow.discard)
+    
+    async def _run(self) -> None:
+        while True:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+            batch = [row]
+            stopping = False
+            deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+            
+            while len(batch) < AUDIT_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            
+            # The in-flight batch is always written, including on shutdown
+            await asyncio.to_thread(self._write, batch)
+            if stopping:
+                return
+    
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert a batch of audit rows in one statement and commit once."""
+        db = self.session_factory()
+        try:
+            db.execute(insert(models.AuditLog), batch)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write {len(batch)} audit log entries: {str(e)}")
+        finally:
+            db.close()
+
+# Shared writer, started and stopped with the application
+audit_writer = AuditLogWriter()
+
 class AuditLogger:
     """
     A class to handle audit logging for the application.
     Logs to both database and application log file.
     """
     
-    def __init__(self, db: Session, logger_name: str = 'audit'):
+    def __init__(
+        self,
+        db: Session,
+        logger_name: str = 'audit',
+        audit_session_factory: Optional[Callable[[], Session]] = AuditSessionLocal
+    ):
         """
         Initialize the audit logger.
         
         Args:
-            db: SQLAlchemy database session
+            db: SQLAlchemy database session (used for reading logs)
             logger_name: Name for the logger instance
+            audit_session_factory: Session factory for unbuffered writes; pass
+                None to write on `db` instead
         """
         self.db = db
         self.logger = logging.getLogger(logger_name)
+        self.audit_session_factory = audit_session_factory
         
     def _log_to_database(
         self,
@@ -59,23 +203,32 @@ class AuditLogger:
             user_agent: User agent string of the requester
             status: Status of the action (success/failure)
         """
+        row = {
+            "action": action.value,
+            "resource_type": resource_type,
+            "resource_id": str(resource_id) if resource_id else None,
+            "user_id": user_id,
+            "details": details or {},
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "status": status,
+            "timestamp": datetime.utcnow()
+        }
+        
+        # Prefer the batched writer; fall back to a direct write
+        if audit_writer.submit(row):
+            return
+        
+        db = self.audit_session_factory() if self.audit_session_factory else self.db
         try:
-            log_entry = models.AuditLog(
-                action=action.value,
-                resource_type=resource_type,
-                resource_id=str(resource_id) if resource_id else None,
-                user_id=user_id,
-                details=details or {},
-                ip_address=ip_address,
-                user_agent=user_agent,
-                status=status,
-                timestamp=datetime.utcnow()
-            )
-            self.db.add(log_entry)
-            self.db.commit()
+            db.add(models.AuditLog(**row))
+            db.commit()
         except Exception as e:
-            self.db.rollback()
+            db.rollback()
             self.logger.error(f"Failed to log to database: {str(e)}")
+        finally:
+            if db is not self.db:
+                db.close()
     
     def _log_to_file(
         self,
@@ -99,22 +252,22 @@ class AuditLogger:
             ip_address: IP address of the requester
             status: Status of the action (success/failure)
         """
-        log_message = (
-            f"action={action.value} "
-            f"resource_type={resource_type} "
-            f"resource_id={resource_id or 'N/A'} "
-            f"user_id={user_id or 'anonymous'} "
-            f"ip={ip_address or 'unknown'} "
-            f"status={status}"
-        )
-        
-        if details:
-            log_message += f" details={details}"
+        level = logging.WARNING if status == "failure" else logging.INFO
+        # Skip serializing details (and formatting) when nothing would be emitted
+        if not self.logger.isEnabledFor(level):
+            return
         
-        if status == "failure":
-            self.logger.warning(log_message)
-        else:
-            self.logger.info(log_message)
+        self.logger.log(
+            level,
+            "action=%s resource_type=%s resource_id=%s user_id=%s ip=%s status=%s%s",
+            action.value,
+            resource_type,
+            resource_id or 'N/A',
+            user_id or 'anonymous',
+            ip_address or 'unknown',
+            status,
+            f" details={json_dumps(details)}" if details else ""
+        )
     
     def log(
         self,
@@ -202,4 +355,7 @@ class AuditLogger:
         if status is not None:
             query = query.filter(models.AuditLog.status == status)
         
-        return query.order_by(models.AuditLog.timestamp.desc()).limit(limit).all()
+        # Load the acting users in one extra query rather than one per row
+        return query.options(selectinload(models.AuditLog.user)).order_by(
+            models.AuditLog.timestamp.desc()
+        ).limit(limit).all()
@@ -0,0 +1,15 @@
+-- Indexes backing the public heatmap/stats queries (PostgreSQL).
+-- New databases get these from models.Base.metadata.create_all();
+-- run this once against databases created before they were declared.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reports_status_created
+    ON reports (status, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reports_latlon
+    ON reports (latitude, longitude);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_violations_report_id
+    ON violations (report_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_violations_violation_type
+    ON violations (violation_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_violations_severity
+    ON violations (severity);
@@ -0,0 +1,16 @@
+-- PostGIS point columns for spatial filtering (PostgreSQL + PostGIS >= 3.0).
+-- location is generated from latitude/longitude, so writers are unchanged.
+
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+ALTER TABLE reports
+    ADD COLUMN IF NOT EXISTS location geography(POINT, 4326)
+    GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED;
+ALTER TABLE billboards
+    ADD COLUMN IF NOT EXISTS location geography(POINT, 4326)
+    GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reports_location
+    ON reports USING spgist (location);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_billboards_location
+    ON billboards USING spgist (location);
@@ -0,0 +1,26 @@
+-- Pre-aggregated heatmap grid (PostgreSQL + PostGIS).
+-- Refresh on a schedule: python -m app.services.materialized_views
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS heatmap_cells AS
+SELECT ST_Y(g.cell) AS latitude,
+       ST_X(g.cell) AS longitude,
+       g.day,
+       g.violation_type,
+       g.severity,
+       count(*) AS weight
+FROM (
+    SELECT ST_SnapToGrid(r.location::geometry, 0.001) AS cell,
+           date_trunc('day', r.created_at) AS day,
+           v.violation_type,
+           v.severity
+    FROM reports r
+    JOIN violations v ON v.report_id = r.id
+    WHERE r.status = 'RESOLVED'  -- reportstatus labels are member names
+) g
+GROUP BY 1, 2, 3, 4, 5;
+
+-- Required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS ux_heatmap_cells
+    ON heatmap_cells (latitude, longitude, day, violation_type, severity);
+CREATE INDEX IF NOT EXISTS ix_heatmap_cells_day_type
+    ON heatmap_cells (day, violation_type);
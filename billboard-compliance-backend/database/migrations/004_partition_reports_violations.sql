@@ -0,0 +1,75 @@
+-- Monthly range partitioning of reports and violations on created_at
+-- (PostgreSQL 12+). Queries filtering on created_at prune to the needed
+-- months, and retention drops whole expired months instead of deleting
+-- row by row (DataRetentionPolicy.drop_expired_partitions).
+--
+-- Upcoming partitions are created by DataRetentionPolicy.ensure_partitions,
+-- which should run from the same daily job as the retention sweep.
+--
+-- A partitioned table can only enforce uniqueness on keys containing the
+-- partition column, so the primary keys become (id, created_at) and the
+-- violations -> reports foreign key is dropped (the ORM relationship is
+-- unaffected).
+
+BEGIN;
+
+DROP MATERIALIZED VIEW IF EXISTS heatmap_cells;
+ALTER TABLE violations DROP CONSTRAINT IF EXISTS violations_report_id_fkey;
+
+CREATE OR REPLACE FUNCTION pg_temp.partition_by_month(parent text) RETURNS void AS $$
+DECLARE
+    old_table text := parent || '_unpartitioned';
+    columns text;
+    first_month date;
+    month date;
+BEGIN
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', parent, old_table);
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING GENERATED) '
+        'PARTITION BY RANGE (created_at)', parent, old_table
+    );
+    EXECUTE format('ALTER TABLE %I ALTER COLUMN created_at SET NOT NULL', parent);
+    EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id, created_at)', parent);
+    EXECUTE format('ALTER SEQUENCE %I OWNED BY %I.id', parent || '_id_seq', parent);
+
+    EXECUTE format('SELECT date_trunc(''month'', min(created_at))::date FROM %I', old_table)
+        INTO first_month;
+    month := coalesce(first_month, date_trunc('month', now())::date);
+    WHILE month <= date_trunc('month', now() + interval '2 months')::date LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            parent || '_' || to_char(month, 'YYYY_MM'), parent,
+            month, (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', parent || '_default', parent);
+
+    -- Generated columns cannot be copied explicitly
+    SELECT string_agg(quote_ident(column_name), ', ' ORDER BY ordinal_position)
+        INTO columns
+        FROM information_schema.columns
+        WHERE table_name = old_table AND is_generated = 'NEVER';
+    EXECUTE format(
+        'INSERT INTO %I (%s) SELECT %s FROM %I', parent, columns, columns, old_table
+    );
+    EXECUTE format('DROP TABLE %I', old_table);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT pg_temp.partition_by_month('reports');
+SELECT pg_temp.partition_by_month('violations');
+
+-- Indexes are declared on the parents and cascade to every partition
+CREATE INDEX ix_reports_id ON reports (id);
+CREATE INDEX ix_reports_status_created ON reports (status, created_at);
+CREATE INDEX ix_reports_latlon ON reports (latitude, longitude);
+CREATE INDEX ix_reports_location ON reports USING spgist (location);
+CREATE INDEX ix_violations_id ON violations (id);
+CREATE INDEX ix_violations_report_id ON violations (report_id);
+CREATE INDEX ix_violations_violation_type ON violations (violation_type);
+CREATE INDEX ix_violations_severity ON violations (severity);
+
+COMMIT;
+
+-- Recreate heatmap_cells afterwards: database/migrations/003_heatmap_cells.sql
@@ -0,0 +1,14 @@
+-- Covering indexes for the heatmap rollup (PostgreSQL 11+).
+-- Plain CREATE INDEX so this also works on the partitioned tables from 004.
+-- reportstatus labels are the ReportStatus member names (e.g. 'RESOLVED').
+
+CREATE INDEX IF NOT EXISTS ix_reports_heatmap
+    ON reports (status, created_at)
+    INCLUDE (id, latitude, longitude, location)
+    WHERE status = 'RESOLVED';
+
+-- Supersedes the plain report_id index
+CREATE INDEX IF NOT EXISTS ix_violations_cov
+    ON violations (report_id)
+    INCLUDE (violation_type, severity);
+DROP INDEX IF EXISTS ix_violations_report_id;
@@ -0,0 +1,18 @@
+-- At most one active consent per user and type; create_consent upserts
+-- against this index with ON CONFLICT (user_id, consent_type) WHERE status = 'active'.
+
+-- Keep only the newest active row where duplicates already exist
+UPDATE consents c
+SET status = 'expired'
+WHERE c.status = 'active'
+  AND EXISTS (
+      SELECT 1 FROM consents newer
+      WHERE newer.user_id = c.user_id
+        AND newer.consent_type = c.consent_type
+        AND newer.status = 'active'
+        AND newer.id > c.id
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_consents_active
+    ON consents (user_id, consent_type)
+    WHERE status = 'active';
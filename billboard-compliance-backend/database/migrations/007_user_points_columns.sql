@@ -0,0 +1,6 @@
+-- Gamification counters read and written by IncentiveService.
+-- New databases get these from models.Base.metadata.create_all().
+
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS total_points integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS streak_days integer NOT NULL DEFAULT 0;
@@ -0,0 +1,16 @@
+-- Time of each user's latest report, used for streaks instead of scanning
+-- user_points on every submission. Stored as naive UTC.
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS last_report_at timestamp;
+
+-- One-time backfill from the points ledger
+UPDATE users u
+SET last_report_at = p.last_report_at
+FROM (
+    SELECT user_id, max(created_at) AS last_report_at
+    FROM user_points
+    WHERE action = 'report_submitted'
+    GROUP BY user_id
+) p
+WHERE p.user_id = u.id
+  AND u.last_report_at IS NULL;
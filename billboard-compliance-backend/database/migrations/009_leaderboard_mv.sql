@@ -0,0 +1,19 @@
+-- Precomputed leaderboard (see models.leaderboard_mv).
+-- Refresh every 5 minutes, e.g. from cron:
+--   python -m app.services.materialized_views
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS leaderboard_mv AS
+SELECT u.id::text AS user_id,
+       u.full_name AS username,
+       coalesce(u.total_points, 0) AS score,
+       count(r.id) AS reports,
+       row_number() OVER (ORDER BY u.total_points DESC NULLS LAST, u.id) AS rank
+FROM users u
+LEFT JOIN reports r ON r.reporter_id = u.id
+GROUP BY u.id;
+
+-- Unique index required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS ux_leaderboard_mv_user_id
+    ON leaderboard_mv (user_id);
+CREATE INDEX IF NOT EXISTS ix_leaderboard_mv_rank
+    ON leaderboard_mv (rank);
@@ -0,0 +1,30 @@
+-- Denormalized per-user report count, maintained on report creation so the
+-- leaderboard no longer joins and groups the reports table.
+
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS report_count integer NOT NULL DEFAULT 0;
+
+-- One-time backfill
+UPDATE users u
+SET report_count = r.report_count
+FROM (
+    SELECT reporter_id, count(*) AS report_count
+    FROM reports
+    GROUP BY reporter_id
+) r
+WHERE r.reporter_id = u.id;
+
+-- Rebuild the leaderboard from the counter instead of the join
+DROP MATERIALIZED VIEW IF EXISTS leaderboard_mv;
+CREATE MATERIALIZED VIEW leaderboard_mv AS
+SELECT u.id::text AS user_id,
+       u.full_name AS username,
+       coalesce(u.total_points, 0) AS score,
+       u.report_count AS reports,
+       row_number() OVER (ORDER BY u.total_points DESC NULLS LAST, u.id) AS rank
+FROM users u;
+
+CREATE UNIQUE INDEX ux_leaderboard_mv_user_id
+    ON leaderboard_mv (user_id);
+CREATE INDEX ix_leaderboard_mv_rank
+    ON leaderboard_mv (rank);
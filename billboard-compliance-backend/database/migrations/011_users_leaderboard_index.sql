@@ -0,0 +1,7 @@
+-- Leaderboard ordering (total_points DESC NULLS LAST, id) with the other
+-- leaderboard columns included, so ranking users is an index-only scan.
+-- Check with: EXPLAIN (ANALYZE, BUFFERS) on the leaderboard_mv definition.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_total_points_desc
+    ON users (total_points DESC NULLS LAST, id)
+    INCLUDE (full_name, report_count);
@@ -0,0 +1,5 @@
+-- Backs AuditLogger.get_recent_logs: ORDER BY timestamp DESC LIMIT n with
+-- optional user_id/action filters, read newest-first straight off the index.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_ts_desc
+    ON audit_logs (timestamp DESC, user_id, action);
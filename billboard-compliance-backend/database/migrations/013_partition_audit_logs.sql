@@ -0,0 +1,48 @@
+-- Monthly range partitioning of audit_logs on timestamp (PostgreSQL 12+).
+-- Inserts land in the current month's partition, get_recent_logs prunes to
+-- the newest partitions, and retention drops whole expired months
+-- (DataRetentionPolicy.drop_expired_partitions). Upcoming partitions are
+-- created by DataRetentionPolicy.ensure_partitions, as for reports and
+-- violations (see 004).
+--
+-- The primary key becomes (id, timestamp), since uniqueness on a
+-- partitioned table must include the partition column.
+
+BEGIN;
+
+ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned;
+
+CREATE TABLE audit_logs (LIKE audit_logs_unpartitioned INCLUDING DEFAULTS)
+    PARTITION BY RANGE (timestamp);
+ALTER TABLE audit_logs ALTER COLUMN timestamp SET NOT NULL;
+ALTER TABLE audit_logs ADD PRIMARY KEY (id, timestamp);
+ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id;
+
+DO $$
+DECLARE
+    month date;
+BEGIN
+    SELECT coalesce(
+        date_trunc('month', min(timestamp))::date,
+        date_trunc('month', now())::date
+    ) INTO month FROM audit_logs_unpartitioned;
+
+    WHILE month <= date_trunc('month', now() + interval '2 months')::date LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+            'audit_logs_' || to_char(month, 'YYYY_MM'),
+            month, (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+END;
+$$;
+CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+INSERT INTO audit_logs SELECT * FROM audit_logs_unpartitioned;
+DROP TABLE audit_logs_unpartitioned;
+
+-- Declared on the parent so every partition gets a local copy
+CREATE INDEX ix_audit_logs_ts_desc ON audit_logs (timestamp DESC, user_id, action);
+
+COMMIT;
@@ -0,0 +1,10 @@
+-- Store audit log details as jsonb so they can be searched by key/value
+-- (details @> '{...}') through a GIN index instead of a full scan.
+-- jsonb_path_ops keeps the index small; it supports containment and
+-- jsonpath queries only, which is all the audit search needs.
+-- The column type change rewrites every partition of audit_logs (013).
+
+ALTER TABLE audit_logs ALTER COLUMN details TYPE jsonb USING details::jsonb;
+
+CREATE INDEX IF NOT EXISTS ix_audit_logs_details_gin
+    ON audit_logs USING GIN (details jsonb_path_ops);
@@ -0,0 +1,50 @@
+-- Awards points for an action in one round trip: streak bookkeeping for
+-- report submissions, the user_points ledger row and the users counters.
+-- Called by IncentiveService.award_points, which passes the base points
+-- and per-day streak bonus from its POINTS table; returns the points
+-- awarded. Runs in the caller's transaction.
+
+CREATE OR REPLACE FUNCTION award_points(
+    p_user integer,
+    p_action text,
+    p_points integer,
+    p_streak_bonus integer,
+    p_meta jsonb
+) RETURNS integer AS $$
+DECLARE
+    v_now timestamp := now() AT TIME ZONE 'utc';
+    v_last timestamp;
+    v_streak integer;
+    v_points integer := p_points;
+BEGIN
+    IF p_action = 'report_submitted' THEN
+        SELECT last_report_at, streak_days INTO v_last, v_streak
+        FROM users WHERE id = p_user FOR UPDATE;
+
+        -- Reports within 36 hours of the last one keep the streak as is;
+        -- within 48 hours extend it, otherwise start over
+        IF FOUND AND v_last IS NOT NULL AND v_now - v_last >= interval '36 hours' THEN
+            IF v_now - v_last < interval '48 hours' THEN
+                v_streak := coalesce(v_streak, 0) + 1;
+            ELSE
+                v_streak := 1;
+            END IF;
+            -- The bonus only starts on the second consecutive day
+            IF v_streak > 1 THEN
+                v_points := v_points + v_streak * p_streak_bonus;
+            END IF;
+        END IF;
+    END IF;
+
+    INSERT INTO user_points (user_id, points, action, metadata)
+    VALUES (p_user, v_points, p_action, coalesce(p_meta, '{}'::jsonb));
+
+    UPDATE users
+    SET total_points = coalesce(total_points, 0) + v_points,
+        last_report_at = CASE WHEN p_action = 'report_submitted' THEN v_now ELSE last_report_at END,
+        streak_days = coalesce(v_streak, streak_days)
+    WHERE id = p_user;
+
+    RETURN v_points;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,40 @@
+-- Maintain users.report_count in the database instead of the API: a row
+-- trigger on reports (and, being declared on the partitioned parent, on
+-- every partition) adjusts the reporter's counter on insert, delete and
+-- reassignment. Dropping whole partitions bypasses row triggers, so
+-- DataRetentionPolicy subtracts those counts itself. PostgreSQL 11+.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION trg_user_report_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE users SET report_count = report_count - 1 WHERE id = OLD.reporter_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE users SET report_count = report_count + 1 WHERE id = NEW.reporter_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS reports_user_report_count ON reports;
+CREATE TRIGGER reports_user_report_count
+    AFTER INSERT OR DELETE OR UPDATE OF reporter_id ON reports
+    FOR EACH ROW EXECUTE FUNCTION trg_user_report_count();
+
+-- Resync the counters, which the API-side bookkeeping did not decrement
+-- when retention removed reports
+WITH counts AS (
+    SELECT u.id, count(r.id) AS report_count
+    FROM users u
+    LEFT JOIN reports r ON r.reporter_id = u.id
+    GROUP BY u.id
+)
+UPDATE users u
+SET report_count = c.report_count
+FROM counts c
+WHERE c.id = u.id
+  AND u.report_count <> c.report_count;
+
+COMMIT;
@@ -0,0 +1,55 @@
+-- award_points() now also returns the user's new total_points and
+-- streak_days straight from its UPDATE ... RETURNING, so the service can
+-- refresh the cached rewards summary without reading the user back.
+-- The result type changes, hence DROP + CREATE instead of REPLACE.
+
+BEGIN;
+
+DROP FUNCTION IF EXISTS award_points(integer, text, integer, integer, jsonb);
+
+CREATE OR REPLACE FUNCTION award_points(
+    p_user integer,
+    p_action text,
+    p_points integer,
+    p_streak_bonus integer,
+    p_meta jsonb
+) RETURNS TABLE (awarded integer, total_points integer, streak_days integer) AS $$
+DECLARE
+    v_now timestamp := now() AT TIME ZONE 'utc';
+    v_last timestamp;
+    v_streak integer;
+    v_points integer := p_points;
+BEGIN
+    IF p_action = 'report_submitted' THEN
+        SELECT u.last_report_at, u.streak_days INTO v_last, v_streak
+        FROM users u WHERE u.id = p_user FOR UPDATE;
+
+        -- Reports within 36 hours of the last one keep the streak as is;
+        -- within 48 hours extend it, otherwise start over
+        IF FOUND AND v_last IS NOT NULL AND v_now - v_last >= interval '36 hours' THEN
+            IF v_now - v_last < interval '48 hours' THEN
+                v_streak := coalesce(v_streak, 0) + 1;
+            ELSE
+                v_streak := 1;
+            END IF;
+            -- The bonus only starts on the second consecutive day
+            IF v_streak > 1 THEN
+                v_points := v_points + v_streak * p_streak_bonus;
+            END IF;
+        END IF;
+    END IF;
+
+    INSERT INTO user_points (user_id, points, action, metadata)
+    VALUES (p_user, v_points, p_action, coalesce(p_meta, '{}'::jsonb));
+
+    RETURN QUERY
+    UPDATE users u
+    SET total_points = coalesce(u.total_points, 0) + v_points,
+        last_report_at = CASE WHEN p_action = 'report_submitted' THEN v_now ELSE u.last_report_at END,
+        streak_days = coalesce(v_streak, u.streak_days)
+    WHERE u.id = p_user
+    RETURNING v_points, u.total_points, u.streak_days;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from app.cache import (
+    HEATMAP_NAMESPACE, REWARDS_NAMESPACE, STATS_NAMESPACE, ORJSONCoder,
+    heatmap_key_builder, invalidate, rewards_key, stats_key_builder
+)
+
+PREFIX = "billboard-cache"
+
+@pytest.fixture(autouse=True)
+def backend():
+    backend = InMemoryBackend()
+    FastAPICache.init(backend, prefix=PREFIX, coder=ORJSONCoder)
+    yield backend
+    backend._store.clear()
+
+@pytest.mark.parametrize("namespace", [STATS_NAMESPACE, f"{PREFIX}:{STATS_NAMESPACE}"])
+def test_stats_key_is_prefixed_once(namespace):
+    assert stats_key_builder(None, namespace) == f"{PREFIX}:{STATS_NAMESPACE}:all"
+
+def test_heatmap_key_uses_query_parameters():
+    key = heatmap_key_builder(
+        None, HEATMAP_NAMESPACE,
+        kwargs={"days": 7, "violation_type": "unauthorized", "bbox": None}
+    )
+    assert key == f"{PREFIX}:{HEATMAP_NAMESPACE}:7:unauthorized:None"
+
+def test_rewards_key():
+    assert rewards_key(42) == f"{PREFIX}:{REWARDS_NAMESPACE}:42"
+
+def test_invalidate_clears_namespace(backend):
+    async def scenario():
+        stats_key = stats_key_builder(None, STATS_NAMESPACE)
+        heatmap_key = heatmap_key_builder(None, HEATMAP_NAMESPACE, kwargs={"days": 30})
+        await backend.set(stats_key, b"{}", 60)
+        await backend.set(heatmap_key, b"[]", 60)
+        
+        await invalidate(STATS_NAMESPACE)
+        
+        assert await backend.get(stats_key) is None
+        assert await backend.get(heatmap_key) == b"[]"
+    
+    asyncio.run(scenario())
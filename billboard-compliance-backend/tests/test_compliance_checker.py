@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.compliance_checker import ComplianceChecker
+
+def make_billboard(id, width, height=10.0, permit_number=None, certificate=None):
+    return SimpleNamespace(
+        id=id,
+        zone_type="commercial",
+        billboard_type="unipoles",
+        width_meters=width,
+        height_meters=height,
+        structural_certificate_id=certificate,
+        permit_number=permit_number,
+    )
+
+def strip_timestamp(result):
+    return {key: value for key, value in result.items() if key != "checked_at"}
+
+@pytest.fixture(scope="module")
+def checker():
+    return ComplianceChecker()
+
+def test_check_batch_matches_single_checks(checker):
+    billboards = [
+        make_billboard(1, width=1.0, permit_number="P-1", certificate="C-1"),
+        make_billboard(2, width=30.0),
+        make_billboard(3, width=100.0, height=50.0, permit_number="P-3"),
+    ]
+    report_data = [
+        {},
+        {"content_analysis": {"detected_content": {"obscene": 0.9, "hate_speech": 0.7}}},
+        {"location": {"distance_from_intersection": 1.0}},
+    ]
+    
+    batch = checker.check_batch(billboards, report_data)
+    single = [
+        checker.check_billboard_compliance(billboard, data)
+        for billboard, data in zip(billboards, report_data)
+    ]
+    
+    assert [strip_timestamp(r) for r in batch] == [strip_timestamp(r) for r in single]
+
+def test_cached_violations_are_not_shared(checker):
+    billboard = make_billboard(10, width=30.0)
+    first = checker.check_billboard_compliance(billboard, {})
+    assert first["violations"]
+    
+    first["violations"][0]["message"] = "changed"
+    first["violations"][0]["details"]["changed"] = True
+    
+    second = checker.check_billboard_compliance(billboard, {})
+    assert second["violations"][0]["message"] != "changed"
+    assert "changed" not in second["violations"][0]["details"]
+
+def test_cache_tracks_billboard_changes(checker):
+    billboard = make_billboard(20, width=30.0)
+    assert not checker.check_billboard_compliance(billboard, {})["is_compliant"]
+    
+    billboard.width_meters = billboard.height_meters = 1.0
+    billboard.permit_number, billboard.structural_certificate_id = "P-20", "C-20"
+    assert checker.check_billboard_compliance(billboard, {})["is_compliant"]
@@ -0,0 +1,93 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.services import incentive_service
+from app.services.incentive_service import IncentiveService
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+    
+    def one_or_none(self):
+        return self.row
+
+class FakeSession:
+    """Records executed statements and returns a fixed award_points() row."""
+    
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+    
+    def execute(self, statement, params=None):
+        self.executed.append((str(statement), params))
+        return FakeResult(self.row)
+    
+    def commit(self):
+        self.commits += 1
+    
+    def rollback(self):
+        self.rollbacks += 1
+
+@pytest.fixture
+def cached(monkeypatch):
+    store = {}
+    
+    async def set_cached(key, value, expire):
+        store[key] = value
+    
+    monkeypatch.setattr(incentive_service, "set_cached", set_cached)
+    return store
+
+def test_award_points_is_one_round_trip(cached):
+    db = FakeSession((25, 125, 3))
+    service = IncentiveService(db)
+    
+    awarded = asyncio.run(service.award_points(7, "report_submitted", {"report_id": 1}))
+    
+    assert awarded == 25
+    assert db.commits == 1
+    [(sql, params)] = db.executed
+    assert "award_points(" in sql
+    assert params["user_id"] == 7
+    assert params["points"] == IncentiveService.POINTS["report_submitted"]
+    assert params["streak_bonus"] == IncentiveService.POINTS["streak_bonus"]
+    assert orjson.loads(params["metadata"]) == {"report_id": 1}
+    
+    # The new totals are written through to the rewards cache
+    [payload] = cached.values()
+    rewards = orjson.loads(payload)
+    assert rewards["current_points"] == 125
+    assert rewards["streak_days"] == 3
+    assert rewards["current_tier"]["name"] == "Enforcer"
+
+def test_award_points_rejects_unknown_users(cached):
+    db = FakeSession(None)
+    
+    with pytest.raises(ValueError, match="User not found"):
+        asyncio.run(IncentiveService(db).award_points(404, "report_submitted"))
+    
+    assert db.rollbacks == 1 and db.commits == 0
+    assert not cached
+
+def test_award_points_ignores_unknown_actions(cached):
+    db = FakeSession(None)
+    assert asyncio.run(IncentiveService(db).award_points(7, "unknown")) == 0
+    assert not db.executed and not cached
+
+@pytest.mark.parametrize("points, tier", [
+    (-5, "Citizen"), (0, "Citizen"), (99, "Citizen"), (100, "Enforcer"),
+    (499, "Enforcer"), (500, "Champion"), (2000, "Legend"), (10 ** 6, "Legend"),
+])
+def test_tier_for_points(points, tier):
+    assert IncentiveService(None)._get_tier_for_points(points)["name"] == tier
+
+def test_rewards_have_the_same_shape_as_cached_rewards():
+    rewards = IncentiveService(None)._build_rewards(150, 2)
+    assert rewards == orjson.loads(orjson.dumps(rewards))
+    assert type(rewards["current_tier"]) is dict
+    assert type(rewards["current_tier"]["benefits"]) is list
+    assert rewards["points_to_next"] == 350
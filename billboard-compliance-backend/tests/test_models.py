@@ -0,0 +1,82 @@
+"""Lazy-load guards: relationships must be loaded explicitly (see models.py)."""
+import os
+import uuid
+
+import pytest
+
+from app import models
+
+requires_db = pytest.mark.skipif(
+    not os.environ.get("BILLBOARD_DB_TESTS"),
+    reason="set BILLBOARD_DB_TESTS=1 to run against the configured PostgreSQL database"
+)
+
+def test_relationships_raise_on_lazy_load():
+    for mapper in models.Base.registry.mappers:
+        for relationship in mapper.relationships:
+            assert relationship.lazy == "raise", (
+                f"{mapper.class_.__name__}.{relationship.key} must use lazy='raise'"
+            )
+
+@pytest.fixture
+def client():
+    """API client with one user, billboard, report and violation in the database."""
+    from fastapi.testclient import TestClient
+    from app import auth
+    from app.database import SessionLocal
+    from app.main import app
+    
+    db = SessionLocal()
+    user = models.User(
+        email=f"raiseload-{uuid.uuid4().hex}@example.com",
+        full_name="Raiseload Test",
+        role=models.UserRole.ADMIN,
+        is_active=True
+    )
+    db.add(user)
+    db.flush()
+    billboard = models.Billboard(latitude=12.97, longitude=77.59, width=6.0, height=3.0)
+    db.add(billboard)
+    db.flush()
+    report = models.Report(
+        billboard_id=billboard.id,
+        reporter_id=user.id,
+        latitude=12.97,
+        longitude=77.59
+    )
+    db.add(report)
+    db.flush()
+    violation = models.Violation(
+        report_id=report.id,
+        billboard_id=billboard.id,
+        reporter_id=user.id,
+        violation_type=models.ViolationType.UNAUTHORIZED,
+        severity="low"
+    )
+    db.add(violation)
+    db.commit()
+    
+    app.dependency_overrides[auth.get_current_active_user] = lambda: user
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        for row in (violation, report, billboard, user):
+            db.delete(row)
+        db.commit()
+        db.close()
+
+@requires_db
+def test_list_endpoints_do_not_lazy_load(client):
+    from fastapi.routing import APIRoute
+    
+    paths = [
+        route.path for route in client.app.routes
+        if isinstance(route, APIRoute) and "GET" in route.methods and "{" not in route.path
+    ]
+    assert paths
+    
+    # A lazy load raises InvalidRequestError, which TestClient re-raises
+    for path in paths:
+        response = client.get(path)
+        assert response.status_code < 500, path